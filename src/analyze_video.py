@@ -0,0 +1,157 @@
+"""Offline scoring of recorded sessions.
+
+Runs pose extraction on each frame of one or more video files, scores
+every level with score_batch and writes, per video:
+  <stem>_landmarks.npy  (frames, 33, 4) float32, NaN where no pose was found
+  <stem>_scores.csv     per-frame accuracy and sub-scores for every level
+
+Videos are cut into time chunks that are processed in parallel worker
+processes. Each chunk starts a little early and throws away those warm-up
+frames, so MediaPipe's tracker has settled by the chunk's first real frame.
+
+    python src/analyze_video.py session1.mp4 session2.mp4 --out results
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from pose_analyzer import POSE_CONFIG, score_batch
+from pose_detector import NUM_LANDMARKS, PoseDetector
+
+
+LEVELS = sorted(POSE_CONFIG)
+
+_detector = None
+_detector_options = None
+
+
+def _get_detector(options):
+    # one MediaPipe graph per worker process, reused across chunks
+    global _detector, _detector_options
+    if _detector is None or _detector_options != options:
+        if _detector is not None:
+            _detector.close()
+        _detector = PoseDetector(**options)
+        _detector_options = options
+    return _detector
+
+
+def plan_chunks(frame_count, fps, chunk_seconds, warmup_seconds):
+    """[(warmup_start, start, end)] frame ranges covering the whole video."""
+    chunk = max(1, int(round(chunk_seconds * fps)))
+    warmup = max(0, int(round(warmup_seconds * fps)))
+    return [(max(0, start - warmup), start, min(frame_count, start + chunk))
+            for start in range(0, frame_count, chunk)]
+
+
+def analyze_chunk(path, warmup_start, start, end, detector_options):
+    """(start, (end - start, 33, 4) landmarks, index after the last frame read).
+
+    The array always covers the whole chunk, NaN where no pose was found or
+    the read failed, so chunks can be concatenated without shifting frames.
+    """
+    detector = _get_detector(detector_options)
+    cap = cv2.VideoCapture(str(path))
+    if warmup_start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, warmup_start)
+    landmarks = np.full((end - start, NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    index = warmup_start
+    while index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        detected = detector.detect(frame)
+        if index >= start and detected is not None:
+            landmarks[index - start] = detected
+        index += 1
+    cap.release()
+    return start, landmarks, index
+
+
+def write_outputs(path, out_dir, fps, landmarks, scores, sub_scores):
+    stem = Path(path).stem
+    np.save(out_dir / f"{stem}_landmarks.npy", landmarks)
+    columns = ["frame", "time_s", "pose_detected"]
+    values = []
+    for column, level in enumerate(LEVELS):
+        columns.append(f"level{level}_accuracy")
+        values.append(scores[:, column])
+        for name, term in sub_scores[level].items():
+            columns.append(f"level{level}_{name}")
+            values.append(term)
+    table = np.round(np.column_stack(values), 3) if values else np.empty((len(landmarks), 0))
+    detected = ~np.isnan(landmarks).any(axis=(1, 2))
+    with open(out_dir / f"{stem}_scores.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for i, row in enumerate(table.tolist()):
+            writer.writerow([i, round(i / fps, 4), int(detected[i])]
+                            + (row if detected[i] else [""] * len(row)))
+
+
+def analyze_video(path, out_dir, executor, chunk_seconds, warmup_seconds, detector_options):
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        print(f"Warning: Unable to open video {path}")
+        return
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    if frame_count <= 0:
+        print(f"Warning: {path} does not report a frame count, cannot split it into chunks; skipping")
+        return
+
+    chunks = plan_chunks(frame_count, fps, chunk_seconds, warmup_seconds)
+    print(f"{path}: {frame_count} frames at {fps:.1f} FPS, {len(chunks)} chunks")
+    futures = [executor.submit(analyze_chunk, path, *chunk, detector_options) for chunk in chunks]
+    parts = []
+    for future in as_completed(futures):
+        parts.append(future.result())
+        print(f"  {len(parts)}/{len(chunks)} chunks done")
+    parts.sort(key=lambda part: part[0])
+
+    landmarks = np.concatenate([part[1] for part in parts])
+    # the reported frame count can overshoot; drop only the unread frames at the very end
+    frames_read = max(part[2] for part in parts)
+    if frames_read < frame_count:
+        print(f"  only {frames_read} of {frame_count} frames could be read")
+    landmarks = landmarks[:frames_read]
+    # every frame and level scored in one vectorized pass
+    scores, sub_scores = score_batch(landmarks, width, height, LEVELS)
+    write_outputs(path, out_dir, fps, landmarks, scores, sub_scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score recorded yoga sessions offline")
+    parser.add_argument("videos", nargs="+", help="video files to analyze")
+    parser.add_argument("--out", default="analysis", help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-seconds", type=float, default=60.0, help="length of one parallel chunk")
+    parser.add_argument("--warmup-seconds", type=float, default=2.0,
+                        help="frames decoded before each chunk and discarded, to let tracking settle")
+    parser.add_argument("--inference-width", type=int, default=640,
+                        help="width frames are downscaled to for pose detection (0 = full resolution)")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    detector_options = {"inference_width": args.inference_width,
+                        "min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as executor:
+        for video in args.videos:
+            analyze_video(video, out_dir, executor, args.chunk_seconds, args.warmup_seconds, detector_options)
+    print(f"Done in {time.monotonic() - start:.1f}s, results in {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import math
+import time
+
+import cv2
+import numpy as np
+
+
+
+class AdaptiveCadence:
+    """Runs MediaPipe every Nth frame and carries landmarks forward with optical flow in between.
+
+    N adapts to two measurements:
+      * inference latency - N is at least large enough that pose.process uses
+        no more than `target_load` of the frame budget on average
+      * landmark motion - the faster the user moves, the smaller N, down to 1
+    On the in-between frames the 33 landmarks are tracked with sparse
+    Lucas-Kanade flow on a small grayscale copy, so callers still get a
+    landmark set for every frame.
+    """
+
+    def __init__(self, detector, max_interval=6, target_load=0.5,
+                 motion_low=0.002, motion_high=0.02, max_lost_fraction=0.3):
+        self.detector = detector
+        self.max_interval = max_interval
+        self.target_load = target_load
+        self.motion_low = motion_low     # normalized units per frame
+        self.motion_high = motion_high
+        self.max_lost_fraction = max_lost_fraction
+        self.interval = 1
+        self.inferences = 0
+        self.propagations = 0
+        self._infer_time = None
+        self._frame_dt = None
+        self._motion = 0.0
+        self._since_inference = 0
+        self._last_timestamp = None
+        self._landmarks = None
+        self._prev_gray = None
+        self._gray = None
+        self._buffers = None
+        self._lk_params = dict(winSize=(21, 21), maxLevel=2,
+                               criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+
+    @staticmethod
+    def _ema(current, sample, alpha=0.2):
+        return sample if current is None else current + alpha * (sample - current)
+
+    def _update_interval(self):
+        motion_span = self.motion_high - self.motion_low
+        ratio = min(1.0, max(0.0, (self._motion - self.motion_low) / motion_span))
+        interval = self.max_interval - ratio * (self.max_interval - 1)
+        if self._infer_time is not None and self._frame_dt:
+            interval = max(interval, self._infer_time / (self.target_load * self._frame_dt))
+        self.interval = int(min(self.max_interval, max(1, math.ceil(interval))))
+
+    def _to_gray(self, rgb):
+        shape = rgb.shape[:2]
+        if self._gray is None or self._gray.shape != shape:
+            self._buffers = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8))
+            self._prev_gray = None
+            self._gray = self._buffers[0]
+        else:
+            # ping-pong between two buffers instead of allocating every frame
+            self._prev_gray = self._gray
+            self._gray = self._buffers[1] if self._gray is self._buffers[0] else self._buffers[0]
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        return self._gray
+
+    def _propagate(self):
+        """Moves the last landmarks by the flow between the previous and current frame.
+
+        Returns False when too many points are lost and MediaPipe should run instead.
+        """
+        h, w = self._gray.shape
+        scale = np.array([w, h], dtype=np.float32)
+        prev_pts = (self._landmarks[:, :2] * scale).reshape(-1, 1, 2)
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, self._gray, prev_pts, None,
+                                                       **self._lk_params)
+        tracked = status.reshape(-1).astype(bool)
+        visible = self._landmarks[:, 3] > 0.5
+        lost = np.count_nonzero(visible & ~tracked)
+        if lost > self.max_lost_fraction * max(1, np.count_nonzero(visible)):
+            return False
+        moved = next_pts.reshape(-1, 2) / scale
+        shift = np.linalg.norm(moved - self._landmarks[:, :2], axis=1)
+        if np.any(tracked & visible):
+            self._motion = self._ema(self._motion, float(np.median(shift[tracked & visible])))
+        self._landmarks[tracked, :2] = moved[tracked]
+        return True
+
+    def detect(self, frame, timestamp=None):
+        """(33, 4) landmarks for every frame, inferred or propagated; None when no pose."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            self._frame_dt = self._ema(self._frame_dt, timestamp - self._last_timestamp)
+        self._last_timestamp = timestamp
+
+        rgb = self.detector.prepare(frame)
+        self._to_gray(rgb)
+        self._since_inference += 1
+
+        if (self._landmarks is not None and self._prev_gray is not None
+                and self._since_inference < self.interval and self._propagate()):
+            self.propagations += 1
+            return self._landmarks.copy()
+
+        start = time.perf_counter()
+        fresh = self.detector.detect(frame, prepared=rgb)
+        self._infer_time = self._ema(self._infer_time, time.perf_counter() - start)
+        self.inferences += 1
+        if fresh is not None:
+            if self._landmarks is not None:
+                shift = np.linalg.norm(fresh[:, :2] - self._landmarks[:, :2], axis=1)
+                visible = fresh[:, 3] > 0.5
+                if np.any(visible):
+                    self._motion = self._ema(self._motion, float(np.median(shift[visible])) / self._since_inference)
+            self._landmarks = fresh
+        else:
+            self._landmarks = None
+        self._since_inference = 0
+        self._update_interval()
+        # _propagate() moves self._landmarks in place; the caller may still be reading the result
+        return None if fresh is None else fresh.copy()
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+
+# image: BGR ndarray, timestamp: time.monotonic() at grab, index: running frame
+# counter from the reader, dropped: frames overwritten since the previous read
+Frame = namedtuple("Frame", ["image", "timestamp", "index", "dropped"])
+
+
+class ThreadedCapture:
+    """Reads a cv2.VideoCapture on a background thread and keeps only the newest frame.
+
+    The main loop never sees a backlog: read() always hands out the most recent
+    frame and reports how many frames were skipped since the previous call.
+    """
+
+    def __init__(self, source=0, width=None, height=None):
+        self.cap = cv2.VideoCapture(source)
+        # ask the driver for the smallest internal queue it supports
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        self._cond = threading.Condition()
+        self._latest = None
+        self._last_read_index = -1
+        self._frame_count = 0
+        self._running = False
+        self._ended = False
+        self._thread = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader(self):
+        while self._running:
+            ret, image = self.cap.read()
+            timestamp = time.monotonic()
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    break
+                self._latest = (image, timestamp, self._frame_count)
+                self._frame_count += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Block until a frame newer than the last one returned is available.
+
+        Returns a Frame, or None once the device stops delivering frames (or the
+        optional timeout expires).
+        """
+        with self._cond:
+            while self._latest is None or self._latest[2] <= self._last_read_index:
+                if self._ended or not self._running:
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+            image, timestamp, index = self._latest
+            dropped = index - self._last_read_index - 1
+            self._last_read_index = index
+        return Frame(image, timestamp, index, dropped)
+
+    @property
+    def frames_captured(self):
+        return self._frame_count
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.cap.release()
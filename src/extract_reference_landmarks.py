@@ -1,11 +1,27 @@
+import argparse
+import os
+
 import cv2
 import mediapipe as mp
 import numpy as np
 
+from pose_index import DEFAULT_INDEX, PoseIndex
+from pose_templates import DEFAULT_TEMPLATES, PoseTemplates
+
+parser = argparse.ArgumentParser(description="Extract pose landmarks from a reference photo")
+parser.add_argument("image", nargs="?", default="reference_mountain_pose.jpg")
+parser.add_argument("--level", type=int, help="save the landmarks as a template for this level")
+parser.add_argument("--name", help="template or catalog name (defaults to the image file name)")
+parser.add_argument("--templates", default=str(DEFAULT_TEMPLATES), help="template file to add to")
+parser.add_argument("--index", nargs="?", const=str(DEFAULT_INDEX),
+                    help="also add the pose to this pose catalog index (default assets/pose_index.npz)")
+parser.add_argument("--no-show", action="store_true", help="do not display the annotated image")
+args = parser.parse_args()
+
 # Load image
-img = cv2.imread('reference_mountain_pose.jpg')
+img = cv2.imread(args.image)
 if img is None:
-    raise FileNotFoundError('reference_mountain_pose.jpg not found!')
+    raise FileNotFoundError(f'{args.image} not found!')
 
 mp_pose = mp.solutions.pose
 pose = mp_pose.Pose(static_image_mode=True)
@@ -29,9 +45,29 @@ for x, y in landmarks:
     print(f'    ({x:.4f}, {y:.4f}),')
 print(']')
 
+# templates and catalog entries are stored in pixels so the photo's aspect ratio is kept
+pixels = np.array(landmarks, dtype=np.float32) * np.array([w, h], dtype=np.float32)
+name = args.name or os.path.splitext(os.path.basename(args.image))[0]
+
+if args.level is not None:
+    if os.path.exists(args.templates):
+        templates = PoseTemplates.load(args.templates)
+    else:
+        templates = PoseTemplates([], [], [])
+    templates = templates.add(name, args.level, pixels)
+    templates.save(args.templates)
+    print(f"Saved template '{name}' for level {args.level} to {args.templates} ({len(templates)} templates)")
+
+if args.index is not None:
+    index = PoseIndex.load(args.index) if os.path.exists(args.index) else PoseIndex()
+    index.add(name, pixels, args.level or 0)
+    index.save(args.index)
+    print(f"Added '{name}' to pose index {args.index} ({len(index)} poses)")
+
 # Optional: visualize
-for x, y in landmarks:
-    cv2.circle(img, (int(x*w), int(y*h)), 5, (0,255,0), -1)
-cv2.imshow('Reference Pose Landmarks', img)
-cv2.waitKey(0)
-cv2.destroyAllWindows() 
\ No newline at end of file
+if not args.no_show:
+    for x, y in landmarks:
+        cv2.circle(img, (int(x*w), int(y*h)), 5, (0,255,0), -1)
+    cv2.imshow('Reference Pose Landmarks', img)
+    cv2.waitKey(0)
+    cv2.destroyAllWindows()
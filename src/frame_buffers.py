@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class FrameArena:
+    """Output buffers for one display resolution, allocated once and reused every frame.
+
+    The window shows the live frame and the reference panel side by side, so
+    both are views into a single persistent canvas: drawing into `live` and
+    `panel` composes the final image in place, with no np.hstack and no
+    per-frame full-resolution allocations. Buffers are only reallocated when
+    the frame size changes.
+    """
+
+    def __init__(self):
+        self.shape = None
+        self.canvas = None
+        self.live = None
+        self.panel = None
+
+    def ensure(self, height, width):
+        if self.shape != (height, width):
+            self.canvas = np.zeros((height, width * 2, 3), dtype=np.uint8)
+            self.live = self.canvas[:, :width]
+            self.panel = self.canvas[:, width:]
+            self.shape = (height, width)
+        return self
+
+
+class LayerCache:
+    """Pre-rendered static layers, keyed by everything they depend on, with LRU eviction.
+
+    render(*key) draws a layer from scratch. get(key) renders it on first use
+    and afterwards returns the stored, read-only image, so an unchanged layer
+    costs one copy per frame instead of a redraw. A level switch or a resize
+    is simply a new key; clear() drops everything, e.g. after assets change.
+    """
+
+    def __init__(self, render, max_entries=8):
+        self.render = render
+        self.max_entries = max_entries
+        self.renders = 0
+        self._layers = OrderedDict()
+
+    def get(self, key):
+        layer = self._layers.get(key)
+        if layer is not None:
+            self._layers.move_to_end(key)
+            return layer
+        layer = self.render(*key)
+        layer.flags.writeable = False
+        self._layers[key] = layer
+        if len(self._layers) > self.max_entries:
+            self._layers.popitem(last=False)
+        self.renders += 1
+        return layer
+
+    def clear(self):
+        self._layers.clear()
+
+
+def _clip(frame, x, y, shape):
+    """(frame rows, frame cols, patch rows, patch cols) for a patch at (x, y), or None when fully outside."""
+    h, w = frame.shape[:2]
+    cx0, cy0 = max(x, 0), max(y, 0)
+    cx1, cy1 = min(x + shape[1], w), min(y + shape[0], h)
+    if cx0 >= cx1 or cy0 >= cy1:
+        return None
+    return slice(cy0, cy1), slice(cx0, cx1), slice(cy0 - y, cy1 - y), slice(cx0 - x, cx1 - x)
+
+
+def blit_masked(frame, x, y, patch, mask):
+    """Copies `patch` into `frame` with its top-left corner at (x, y) where `mask` is set, clipped to the frame."""
+    clip = _clip(frame, x, y, patch.shape)
+    if clip is None:
+        return
+    rows, cols, patch_rows, patch_cols = clip
+    # cv2.copyTo writes through the ROI view; several times faster than np.copyto(where=)
+    cv2.copyTo(patch[patch_rows, patch_cols], mask[patch_rows, patch_cols], frame[rows, cols])
+
+
+def blit_premultiplied(frame, x, y, inverse_alpha, color=None):
+    """Alpha-blends a patch at (x, y): frame * inverse_alpha / 255 + color.
+
+    `color` is premultiplied by alpha; None only darkens (a shadow). Both are
+    uint8 arrays shaped like the frame region, so the blend is two saturating
+    cv2 calls on the clipped region.
+    """
+    clip = _clip(frame, x, y, inverse_alpha.shape)
+    if clip is None:
+        return
+    rows, cols, patch_rows, patch_cols = clip
+    region = frame[rows, cols]
+    cv2.multiply(region, inverse_alpha[patch_rows, patch_cols], dst=region, scale=1 / 255)
+    if color is not None:
+        cv2.add(region, color[patch_rows, patch_cols], dst=region)
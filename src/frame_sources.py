@@ -0,0 +1,214 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from capture import Frame, ThreadedCapture
+
+
+# Every source exposes the same small interface the main loop consumes:
+#   read()      -> Frame(image, timestamp, index, dropped), or None when exhausted
+#   release()
+# Timestamps are on the time.monotonic() scale. Sources that replay recorded
+# material stamp frames with media time, so a replay run faster than real time
+# still carries the original timing.
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+class CameraSource(ThreadedCapture):
+    """Live camera, read on a background thread (newest frame wins)."""
+
+    def __init__(self, index=0, width=1920, height=1080):
+        super().__init__(index, width=width, height=height)
+        self.start()
+
+
+class VideoFileSource:
+    """Frames from a video file.
+
+    With realtime=True the file is paced like a camera: read() waits for each
+    frame's presentation time and skips frames the consumer was too slow for.
+    With realtime=False frames are returned as fast as they can be decoded.
+    """
+
+    def __init__(self, path, realtime=True):
+        self.path = str(path)
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Unable to open video file {self.path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self._index = 0
+        self._start = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        if self._start is None:
+            self._start = time.monotonic()
+        dropped = 0
+        if self.realtime:
+            # skip frames whose presentation time has already passed
+            due_index = int((time.monotonic() - self._start) * self.fps)
+            while self._index < due_index:
+                if not self.cap.grab():
+                    return None
+                self._index += 1
+                dropped += 1
+            delay = self._start + self._index / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        frame = Frame(image, self._start + self._index / self.fps, self._index, dropped)
+        self._index += 1
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+
+def letterbox(img, size):
+    """Fits img into size (width, height) keeping its aspect ratio, centred on black bars.
+
+    Stretching would change every angle and distance the scorers measure.
+    """
+    width, height = size
+    h, w = img.shape[:2]
+    scale = min(width / w, height / h)
+    fitted_w, fitted_h = max(1, round(w * scale)), max(1, round(h * scale))
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    x, y = (width - fitted_w) // 2, (height - fitted_h) // 2
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    cv2.resize(img, (fitted_w, fitted_h), dst=canvas[y:y + fitted_h, x:x + fitted_w], interpolation=interpolation)
+    return canvas
+
+
+class ImageDirectorySource:
+    """Still images from a directory (e.g. assets/pose_images), in name order.
+
+    Each image is shown for `repeat` consecutive frames so pose holds can be
+    exercised, stamped at `fps`. Images are letterboxed into `size` (width,
+    height) when given so the whole run has one resolution without distorting
+    the poses.
+    """
+
+    def __init__(self, directory, fps=30.0, repeat=1, loop=False, size=None, realtime=False):
+        paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        self.images = []
+        for path in paths:
+            img = cv2.imread(str(path))
+            if img is None:
+                print(f"Warning: Unable to read image {path}")
+                continue
+            if size is not None:
+                img = letterbox(img, size)
+            self.images.append(img)
+        if not self.images:
+            raise FileNotFoundError(f"No readable images in {directory}")
+        self.fps = fps
+        self.repeat = max(1, int(repeat))
+        self.loop = loop
+        self.realtime = realtime
+        self._index = 0
+        self._start = None
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self._start is None:
+            self._start = time.monotonic()
+        image_idx = self._index // self.repeat
+        if image_idx >= len(self.images):
+            if not self.loop:
+                return None
+            image_idx %= len(self.images)
+        timestamp = self._start + self._index / self.fps
+        if self.realtime:
+            delay = timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        # hand out a copy: the main loop draws on the frame it gets
+        frame = Frame(self.images[image_idx].copy(), timestamp, self._index, 0)
+        self._index += 1
+        return frame
+
+    def release(self):
+        self.images = []
+
+
+class SyntheticSource:
+    """Generated frames for benchmarking without a camera or any media files.
+
+    Draws a moving stick figure on a gradient so motion-dependent stages
+    have something to react to.
+    """
+
+    def __init__(self, width=1920, height=1080, fps=30.0, count=300, realtime=False):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.count = count
+        self.realtime = realtime
+        ramp = np.linspace(40, 120, height, dtype=np.float32).astype(np.uint8)
+        self._background = np.repeat(ramp[:, None, None], width, axis=1).repeat(3, axis=2)
+        self._index = 0
+        self._start = None
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.count is not None and self._index >= self.count:
+            return None
+        if self._start is None:
+            self._start = time.monotonic()
+        timestamp = self._start + self._index / self.fps
+        if self.realtime:
+            delay = timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        image = self._background.copy()
+        w, h = self.width, self.height
+        sway = np.sin(self._index / self.fps * 2 * np.pi * 0.25)
+        cx = int(w * (0.5 + 0.1 * sway))
+        head = (cx, int(h * 0.2))
+        hip = (cx, int(h * 0.55))
+        cv2.circle(image, head, int(h * 0.06), (200, 200, 220), -1)
+        cv2.line(image, head, hip, (200, 200, 220), int(h * 0.03))
+        arm_y = int(h * (0.35 - 0.1 * sway))
+        cv2.line(image, (cx, int(h * 0.32)), (cx - int(w * 0.1), arm_y), (200, 200, 220), int(h * 0.02))
+        cv2.line(image, (cx, int(h * 0.32)), (cx + int(w * 0.1), arm_y), (200, 200, 220), int(h * 0.02))
+        cv2.line(image, hip, (cx - int(w * 0.05), int(h * 0.9)), (200, 200, 220), int(h * 0.025))
+        cv2.line(image, hip, (cx + int(w * 0.05), int(h * 0.9)), (200, 200, 220), int(h * 0.025))
+        frame = Frame(image, timestamp, self._index, 0)
+        self._index += 1
+        return frame
+
+    def release(self):
+        pass
+
+
+def open_frame_source(spec, realtime=True, width=1920, height=1080, fps=30.0, count=300, repeat=30):
+    """Builds a frame source from a command line spec.
+
+    "camera" or "camera:N" -> live camera N, "synthetic" -> generated frames,
+    a directory -> its still images, anything else -> a video file.
+    """
+    if spec == "camera" or spec.startswith("camera:"):
+        index = int(spec.split(":", 1)[1]) if ":" in spec else 0
+        return CameraSource(index, width, height)
+    if spec == "synthetic":
+        return SyntheticSource(width, height, fps, count, realtime=realtime)
+    path = Path(spec)
+    if path.is_dir():
+        return ImageDirectorySource(path, fps=fps, repeat=repeat, size=(width, height), realtime=realtime)
+    if path.exists():
+        return VideoFileSource(path, realtime=realtime)
+    raise FileNotFoundError(f"Unknown frame source: {spec}")
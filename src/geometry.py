@@ -0,0 +1,52 @@
+import numpy as np
+
+
+# All kernels take points shaped (..., N, 2) - any number of leading batch
+# dimensions (frames, people, ...) - and index arrays shared by the whole
+# batch, so one call replaces a Python loop of scalar helper calls.
+# Degenerate input (coincident points) never raises: the affected entries
+# come back as 0 instead.
+
+
+def _index(indices, width):
+    indices = np.asarray(indices, dtype=np.intp)
+    return indices.reshape(-1, width)
+
+
+def joint_angles(points, triplets):
+    """Angles in degrees at the middle point of each (a, vertex, b) triplet -> (..., K).
+
+    Returns 0 where either arm of the angle has zero length.
+    """
+    triplets = _index(triplets, 3)
+    a = points[..., triplets[:, 0], :]
+    vertex = points[..., triplets[:, 1], :]
+    b = points[..., triplets[:, 2], :]
+    v1 = a - vertex
+    v2 = b - vertex
+    dot = np.einsum("...i,...i->...", v1, v2)
+    norms = np.sqrt(np.einsum("...i,...i->...", v1, v1) * np.einsum("...i,...i->...", v2, v2))
+    valid = norms > 0
+    cosine = np.divide(dot, norms, out=np.zeros_like(dot), where=valid)
+    angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    return np.where(valid, angles, 0.0)
+
+
+def segment_lengths(points, pairs):
+    """Euclidean length of each (a, b) pair -> (..., K)."""
+    pairs = _index(pairs, 2)
+    delta = points[..., pairs[:, 0], :] - points[..., pairs[:, 1], :]
+    return np.sqrt(np.einsum("...i,...i->...", delta, delta))
+
+
+def midpoints(points, pairs):
+    """Midpoint of each (a, b) pair -> (..., K, 2)."""
+    pairs = _index(pairs, 2)
+    return (points[..., pairs[:, 0], :] + points[..., pairs[:, 1], :]) * 0.5
+
+
+def torso_length(points, shoulders=(11, 12), hips=(23, 24)):
+    """Distance from mid-shoulder to mid-hip -> (...,)."""
+    mids = midpoints(points, [shoulders, hips])
+    delta = mids[..., 0, :] - mids[..., 1, :]
+    return np.sqrt(np.einsum("...i,...i->...", delta, delta))
@@ -0,0 +1,259 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import cv2
+import numpy as np
+
+from pose_detector import NUM_LANDMARKS
+
+
+def _worker_main(worker_id, conn, frames_name, results_name, num_slots, frame_shape, detector_options):
+    """Worker process: runs its own MediaPipe graph on frames placed in shared memory.
+
+    Receives (slot, frame_id) over its pipe, reads the frame from the shared
+    slot, writes the (33, 4) landmarks into the shared result slot and replies
+    (slot, frame_id, found). Only these small tuples are pickled.
+    """
+    from pose_detector import PoseDetector
+
+    frames_shm = shared_memory.SharedMemory(name=frames_name)
+    results_shm = shared_memory.SharedMemory(name=results_name)
+    frames = np.ndarray((num_slots,) + tuple(frame_shape), dtype=np.uint8, buffer=frames_shm.buf)
+    landmarks = np.ndarray((num_slots, NUM_LANDMARKS, 4), dtype=np.float32, buffer=results_shm.buf)
+    detector = PoseDetector(**detector_options)
+    conn.send(("ready", worker_id))
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            slot, frame_id = task
+            detected = detector.detect(frames[slot])
+            found = detected is not None
+            if found:
+                landmarks[slot] = detected
+            conn.send((slot, frame_id, found))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        detector.close()
+        del frames, landmarks
+        frames_shm.close()
+        results_shm.close()
+
+
+class _Worker:
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.started = time.monotonic()
+        self.task = None        # (slot, frame_id)
+        self.task_started = 0.0
+
+
+class InferencePool:
+    """MediaPipe Pose in one or more worker processes, fed through shared-memory frame slots.
+
+    Frames are copied once into a ring of shared-memory slots instead of being
+    pickled, and landmarks come back through a shared (slots, 33, 4) float32
+    array. Each worker owns a duplex pipe, so a worker that hangs or dies can
+    be killed and replaced by the watchdog without disturbing the others or
+    the UI loop. Its in-flight frame is simply reported as having no pose.
+
+    By default infer() favours latency: it returns the newest finished frame
+    and drops frames when every worker is busy. With ordered=True (offline
+    replay) it waits for a worker instead and returns every frame, in
+    submission order; drain() collects the frames still in flight at the end.
+    """
+
+    def __init__(self, frame_shape, num_workers=2, num_slots=None, task_timeout=2.0, startup_timeout=60.0,
+                 ordered=False, **detector_options):
+        self.frame_shape = tuple(frame_shape)
+        self.num_workers = max(1, num_workers)
+        self.num_slots = num_slots or self.num_workers + 2
+        self.task_timeout = task_timeout
+        self.startup_timeout = startup_timeout
+        self.detector_options = detector_options
+        self.ordered = ordered
+        self.restarts = 0
+        self.submitted = 0
+        self.rejected = 0    # frames not submitted because every worker was busy
+        self.discarded = 0   # finished frames dropped because a newer one was returned
+
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._frames_shm = shared_memory.SharedMemory(create=True, size=self.num_slots * frame_bytes)
+        self._results_shm = shared_memory.SharedMemory(create=True,
+                                                       size=self.num_slots * NUM_LANDMARKS * 4 * 4)
+        self.frames = np.ndarray((self.num_slots,) + self.frame_shape, dtype=np.uint8,
+                                 buffer=self._frames_shm.buf)
+        self.landmarks = np.ndarray((self.num_slots, NUM_LANDMARKS, 4), dtype=np.float32,
+                                    buffer=self._results_shm.buf)
+        self._free_slots = list(range(self.num_slots))
+        self._pending = {}  # slot -> (frame_id, meta)
+        self._next_frame_id = 0
+        self._last_returned_id = -1  # infer() never hands back a frame older than this one
+        self._done = {}  # frame_id -> (meta, landmarks), finished but not returned yet
+        self._ctx = mp.get_context("spawn")
+        self._workers = [self._spawn(i) for i in range(self.num_workers)]
+
+    def _spawn(self, worker_id):
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, self._frames_shm.name, self._results_shm.name,
+                  self.num_slots, self.frame_shape, self.detector_options),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(worker_id, process, parent_conn)
+
+    def _restart(self, worker, reason):
+        print(f"[POOL] Restarting inference worker {worker.worker_id}: {reason}")
+        try:
+            worker.process.terminate()
+            worker.process.join(timeout=1.0)
+            if worker.process.is_alive():
+                worker.process.kill()
+        finally:
+            worker.conn.close()
+        completed = []
+        if worker.task is not None:
+            slot, frame_id = worker.task
+            completed.append(self._complete(slot, False))
+        self._workers[worker.worker_id] = self._spawn(worker.worker_id)
+        self.restarts += 1
+        return completed
+
+    def _complete(self, slot, found):
+        frame_id, meta = self._pending.pop(slot)
+        landmarks = self.landmarks[slot].copy() if found else None
+        self._free_slots.append(slot)
+        return frame_id, meta, landmarks
+
+    def _watchdog(self):
+        now = time.monotonic()
+        completed = []
+        for worker in list(self._workers):
+            if not worker.process.is_alive():
+                completed += self._restart(worker, f"exited with code {worker.process.exitcode}")
+            elif worker.task is not None and now - worker.task_started > self.task_timeout:
+                completed += self._restart(worker, f"no result after {self.task_timeout:.1f}s")
+            elif not worker.ready and now - worker.started > self.startup_timeout:
+                completed += self._restart(worker, "did not start")
+        return completed
+
+    def idle_workers(self):
+        return [w for w in self._workers if w.ready and w.task is None]
+
+    def submit(self, image, meta=None):
+        """Copies a frame into a free slot and hands it to an idle worker.
+
+        Returns False (and drops the frame) when every worker is busy.
+        """
+        idle = self.idle_workers()
+        if not idle or not self._free_slots:
+            self.rejected += 1
+            return False
+        slot = self._free_slots.pop()
+        if image.shape == self.frame_shape:
+            np.copyto(self.frames[slot], image)
+        else:
+            cv2.resize(image, (self.frame_shape[1], self.frame_shape[0]), dst=self.frames[slot])
+        frame_id = self._next_frame_id
+        self._next_frame_id += 1
+        self._pending[slot] = (frame_id, meta)
+        worker = idle[0]
+        worker.task = (slot, frame_id)
+        worker.task_started = time.monotonic()
+        worker.conn.send(worker.task)
+        self.submitted += 1
+        return True
+
+    def poll(self, timeout=0.0):
+        """Collects finished frames as (frame_id, meta, landmarks or None), oldest first."""
+        completed = self._watchdog()
+        conns = {w.conn: w for w in self._workers}
+        ready = wait(list(conns), timeout) if not completed else wait(list(conns), 0)
+        for conn in ready:
+            worker = conns[conn]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                completed += self._restart(worker, "pipe closed")
+                continue
+            if message[0] == "ready":
+                worker.ready = True
+                continue
+            slot, frame_id, found = message
+            worker.task = None
+            completed.append(self._complete(slot, found))
+        completed.sort(key=lambda item: item[0])
+        return completed
+
+    def _collect(self, timeout=0.0):
+        """Polls and keeps finished frames newer than the last returned one until they are handed out."""
+        for frame_id, meta, landmarks in self.poll(timeout):
+            if frame_id <= self._last_returned_id:
+                self.discarded += 1
+            else:
+                self._done[frame_id] = (meta, landmarks)
+
+    def _take(self, frame_id):
+        """Returns frame_id's result; every older finished frame not handed out yet is discarded."""
+        for older in [i for i in self._done if i < frame_id]:
+            del self._done[older]
+            self.discarded += 1
+        self._last_returned_id = frame_id
+        return self._done.pop(frame_id)
+
+    def infer(self, image, meta=None):
+        """Submits a frame and returns a finished (meta, landmarks), or None.
+
+        Unordered, this is the newest finished frame: it only blocks (up to
+        the task timeout) when all workers are busy, so with N workers up to N
+        frames are in flight at once, and results never go back in time.
+        Ordered, it waits for a free worker rather than dropping the frame
+        and returns the oldest frame not handed out yet, at most num_slots
+        frames behind the one just submitted.
+        """
+        if not self.ordered:
+            self.submit(image, meta)
+            busy = not self.idle_workers()
+            self._collect(self.task_timeout if busy else 0.0)
+            return self._take(max(self._done)) if self._done else None
+
+        while not self.idle_workers() or not self._free_slots:
+            self._collect(self.task_timeout)
+        self.submit(image, meta)
+        self._collect()
+        next_id = self._last_returned_id + 1
+        while self._next_frame_id - next_id > self.num_slots and next_id not in self._done:
+            self._collect(self.task_timeout)
+        return self._take(next_id) if next_id in self._done else None
+
+    def drain(self):
+        """Waits for every frame still in flight; returns the ones not handed out yet, oldest first."""
+        while self._pending:
+            self._collect(self.task_timeout)
+        return [self._take(frame_id) for frame_id in sorted(self._done)]
+
+    def close(self):
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=2.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+        del self.frames, self.landmarks
+        for shm in (self._frames_shm, self._results_shm):
+            shm.close()
+            shm.unlink()
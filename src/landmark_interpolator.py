@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class LandmarkInterpolator:
+    """Landmarks for any display timestamp, from the two most recent inference results.
+
+    Inference may run at 10-15 FPS while the camera and the window run at 30.
+    Between results the skeleton is moved along the line through the last two
+    results (x, y, z and visibility alike): interpolated when the display time
+    falls between them, extrapolated past the newest one for at most
+    `max_extrapolation` seconds, after which it holds still. `delay` renders
+    slightly in the past, trading a little latency for more interpolation and
+    less guessing.
+    """
+
+    def __init__(self, max_extrapolation=0.1, delay=0.0):
+        self.max_extrapolation = max_extrapolation
+        self.delay = delay
+        self.reset()
+
+    def reset(self):
+        self._previous = None  # (timestamp, (33, 4) landmarks)
+        self._latest = None
+
+    def push(self, landmarks, timestamp):
+        """Adds an inference result; None (no pose) clears the history, older results are ignored."""
+        if landmarks is None:
+            self.reset()
+            return
+        if self._latest is not None and timestamp <= self._latest[0]:
+            return  # out of order or repeated: not newer than what is already shown
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        self._previous = self._latest
+        self._latest = (timestamp, landmarks)
+
+    def at(self, timestamp):
+        """(33, 4) landmarks for the frame shown at `timestamp`, or None without a pose."""
+        if self._latest is None:
+            return None
+        t1, latest = self._latest
+        if self._previous is None:
+            return latest.copy()
+        t0, previous = self._previous
+        span = t1 - t0
+        if span <= 0:
+            return latest.copy()
+        alpha = (timestamp - self.delay - t0) / span
+        alpha = min(max(alpha, 0.0), 1.0 + self.max_extrapolation / span)
+        out = previous + np.float32(alpha) * (latest - previous)
+        np.clip(out[:, 3], 0.0, 1.0, out=out[:, 3])
+        return out
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+class LandmarkFrame:
+    """One frame's 33 pose landmarks as a single (33, 4) float32 array.
+
+    Columns are normalized x, y, z and visibility as MediaPipe reports them.
+    `normalized` is a view of the x/y columns; `pixels` scales them to the
+    display frame once, on first use, so scoring, the overlay and smoothing
+    all read the same array instead of re-indexing the landmark protobuf
+    point by point.
+    """
+
+    __slots__ = ("data", "width", "height", "_pixels")
+
+    def __init__(self, data, width, height):
+        self.data = np.asarray(data, dtype=np.float32)
+        self.width = width
+        self.height = height
+        self._pixels = None
+
+    @property
+    def normalized(self):
+        return self.data[:, :2]
+
+    @property
+    def visibility(self):
+        return self.data[:, 3]
+
+    @property
+    def pixels(self):
+        """(33, 2) float32 x/y in display-frame pixels."""
+        if self._pixels is None:
+            self._pixels = self.data[:, :2] * np.array([self.width, self.height], dtype=np.float32)
+        return self._pixels
+
+    def __len__(self):
+        return len(self.data)
@@ -1,3 +1,4 @@
+import argparse
 import cv2
 import mediapipe as mp
 import math
@@ -8,43 +9,35 @@ import pyttsx3
 import threading
 import queue
 import urllib.request
+from functools import lru_cache
 from pathlib import Path
-from collections import deque
+
+from frame_sources import open_frame_source
+from pipeline import BLOCK, DROP_OLDEST, FramePipeline
+from pose_detector import PoseDetector
+from landmarks import LandmarkFrame
+from landmark_filter import OneEuroFilter
+from landmark_interpolator import LandmarkInterpolator
+from pose_features import PoseFeatures
+from cadence import AdaptiveCadence
+from motion_gate import MotionGate
+from inference_pool import InferencePool
+from frame_buffers import FrameArena, LayerCache
+from pose_analyzer import ACCURACY_THRESHOLD, check_pose_accuracy, weakest_term
+from pose_recognizer import PoseRecognizer
+from pose_index import DEFAULT_INDEX, PoseIndex
+from pose_templates import DEFAULT_TEMPLATES, PoseTemplates
+from smoothing import AccuracySmoother, HoldTimer
+from skeleton_renderer import DETAIL_LEVELS, SkeletonRenderer
+from text_renderer import TextRenderer
 
 
 DEBUG_METRICS = False   
-ACCURACY_THRESHOLD = 55.0  
 SENSITIVITY = 1.08  
-SMOOTHING_WINDOW = 4 
-
-
-POSE_CONFIG = {
-    1: {  # Mountain
-        'feet_weight': 50.0,
-        'shoulder_weight': 20.0,
-        'arm_weight': 15.0,  # per arm
-        'arm_tolerance': 40.0,
-    },
-    2: {  # Tree
-        'leg_weight': 40.0,
-        'balance_weight': 30.0,
-        'standing_weight': 30.0,
-    },
-    3: {  # Warrior
-        'leg_bend_weight': 40.0,
-        'arms_weight': 30.0,
-        'stance_weight': 30.0,
-    },
-    4: {  # Child
-        'fold_weight': 50.0,
-        'knee_weight': 50.0,
-    },
-    5: {  # Lotus
-        'upright_weight': 50.0,
-        'spine_weight': 30.0,
-        'legs_weight': 20.0,
-    }
-}
+SMOOTHING_SECONDS = 0.1  # time constant of the accuracy moving average, independent of frame rate
+PIPELINE_QUEUE_SIZE = 1
+INFERENCE_WIDTH = 640  # frames are downscaled to this width before pose.process; display stays full size
+
 
 speech_queue = queue.Queue()
 speech_engine = None
@@ -86,11 +79,33 @@ def cleanup_speech():
     except Exception:
         pass
 
-def speak_pose_feedback(is_correct, level, results):
-    # Minimal feedback mapping; can be expanded with more detailed instructions per pose
+# Spoken correction for the scoring term that is furthest from its target
+TERM_HINTS = {
+    'feet_score': "Bring your feet closer together.",
+    'shoulder_score': "Relax your shoulders and keep them level.",
+    'left_arm_score': "Let your left arm hang straight at your side.",
+    'right_arm_score': "Let your right arm hang straight at your side.",
+    'leg_accuracy': "Lift one foot up to the inner thigh of your standing leg.",
+    'balance_accuracy': "Keep your hips level over the standing leg.",
+    'standing_accuracy': "Keep your standing leg straight and strong.",
+    'leg_bend_accuracy': "Bend your front knee to about ninety degrees.",
+    'arms_accuracy': "Reach your arms up above your shoulders.",
+    'stance_accuracy': "Widen your stance and keep the back leg straight.",
+    'fold_accuracy': "Fold forward and lower your head toward the mat.",
+    'knee_accuracy': "Bring your knees in under your hips.",
+    'upright_accuracy': "Sit up tall and lift through the crown of your head.",
+    'spine_accuracy': "Lengthen your spine and keep your head above your shoulders.",
+    'legs_accuracy': "Cross your legs and let your knees rest low.",
+}
+
+def speak_pose_feedback(is_correct, level, sub_scores=None):
     if is_correct:
         speak_text("Good job. Hold the pose.")
         return
+    term = weakest_term(level, sub_scores or {})
+    if term in TERM_HINTS:
+        speak_text(TERM_HINTS[term])
+        return
     hints = {
         1: "Stand tall. Keep feet together, relax your shoulders, and raise arms slightly if needed.",
         2: "Shift weight to one leg and bring the other foot to the inner thigh. Use hands for balance.",
@@ -100,223 +115,32 @@ def speak_pose_feedback(is_correct, level, results):
     }
     speak_text(hints.get(level, "Keep trying. Adjust your alignment and balance."))
 
-def check_pose_accuracy(pose_level, results):
-    if not results or not results.pose_landmarks:
-        return False, 0.0
-
-    accuracy = 0.0
-
-    # compute torso normalization distance
-    left_shoulder = find_point(results.pose_landmarks, 11)
-    right_shoulder = find_point(results.pose_landmarks, 12)
-    left_hip = find_point(results.pose_landmarks, 23)
-    right_hip = find_point(results.pose_landmarks, 24)
-    mid_sh = ((left_shoulder[0] + right_shoulder[0]) / 2.0, (left_shoulder[1] + right_shoulder[1]) / 2.0)
-    mid_hip = ((left_hip[0] + right_hip[0]) / 2.0, (left_hip[1] + right_hip[1]) / 2.0)
-    torso_dist = euclidian(mid_sh, mid_hip)
-    if torso_dist < 1:
-        torso_dist = max(height, width) / 4.0
-
-    sub_scores = {}
-    cfg = POSE_CONFIG.get(pose_level, {})
-
-    if pose_level == 1:  # Mountain Pose
-        left_ankle = find_point(results.pose_landmarks, 27)
-        right_ankle = find_point(results.pose_landmarks, 28)
-        left_wrist = find_point(results.pose_landmarks, 15)
-        right_wrist = find_point(results.pose_landmarks, 16)
-
-        shoulder_gap = abs(left_shoulder[0] - right_shoulder[0])
-        ankle_gap = abs(left_ankle[0] - right_ankle[0])
-
-        left_arm_angle = angle_calc(left_wrist, left_shoulder, find_point(results.pose_landmarks, 13))
-        right_arm_angle = angle_calc(right_wrist, right_shoulder, find_point(results.pose_landmarks, 14))
-
-        feet_w = cfg.get('feet_weight', 50.0)
-        shoulder_w = cfg.get('shoulder_weight', 20.0)
-        arm_w = cfg.get('arm_weight', 15.0)
-        arm_tol = cfg.get('arm_tolerance', 40.0)
-
-        feet_score = max(0.0, feet_w * (1.0 - (ankle_gap / (torso_dist * 0.6))))
-        shoulder_score = max(0.0, shoulder_w * (1.0 - (shoulder_gap / (torso_dist * 0.9))))
-        left_arm_score = max(0.0, arm_w * (1.0 - abs(left_arm_angle - 170) / arm_tol))
-        right_arm_score = max(0.0, arm_w * (1.0 - abs(right_arm_angle - 170) / arm_tol))
-
-        sub_scores.update({
-            'feet_score': feet_score,
-            'shoulder_score': shoulder_score,
-            'left_arm_score': left_arm_score,
-            'right_arm_score': right_arm_score,
-        })
-
-        accuracy = feet_score + shoulder_score + left_arm_score + right_arm_score
-        accuracy = min(100.0, max(0.0, accuracy))
-
-    elif pose_level == 2:  # Tree Pose
-        left_hip = find_point(results.pose_landmarks, 23)
-        right_hip = find_point(results.pose_landmarks, 24)
-        left_ankle = find_point(results.pose_landmarks, 27)
-        right_ankle = find_point(results.pose_landmarks, 28)
-        left_knee = find_point(results.pose_landmarks, 25)
-        right_knee = find_point(results.pose_landmarks, 26)
-
-        hip_ankle_l = euclidian(left_hip, left_ankle)
-        hip_ankle_r = euclidian(right_hip, right_ankle)
-
-        left_leg_raised = left_ankle[1] < left_hip[1] - torso_dist * 0.35
-        right_leg_raised = right_ankle[1] < right_hip[1] - torso_dist * 0.35
-
-        if left_leg_raised:
-            leg_accuracy = 40.0
-            balance_diff = hip_ankle_l
-        elif right_leg_raised:
-            leg_accuracy = 40.0
-            balance_diff = hip_ankle_r
-        else:
-            leg_accuracy = 0.0
-            balance_diff = max(hip_ankle_l, hip_ankle_r)
-
-        balance_accuracy = max(0.0, 30.0 * (1.0 - abs(hip_ankle_l - hip_ankle_r) / (torso_dist * 0.6)))
-        standing_accuracy = max(0.0, 30.0 * (1.0 - abs(balance_diff - torso_dist * 0.75) / (torso_dist * 0.75)))
-
-        sub_scores.update({
-            'leg_accuracy': leg_accuracy,
-            'balance_accuracy': balance_accuracy,
-            'standing_accuracy': standing_accuracy,
-        })
-
-        accuracy = leg_accuracy + balance_accuracy + standing_accuracy
-        accuracy = min(100.0, max(0.0, accuracy))
-
-    elif pose_level == 3:  # Warrior Pose
-        left_hip = find_point(results.pose_landmarks, 23)
-        right_hip = find_point(results.pose_landmarks, 24)
-        left_knee = find_point(results.pose_landmarks, 25)
-        right_knee = find_point(results.pose_landmarks, 26)
-        left_ankle = find_point(results.pose_landmarks, 27)
-        right_ankle = find_point(results.pose_landmarks, 28)
-        left_wrist = find_point(results.pose_landmarks, 15)
-        right_wrist = find_point(results.pose_landmarks, 16)
-        left_shoulder = find_point(results.pose_landmarks, 11)
-        right_shoulder = find_point(results.pose_landmarks, 12)
-
-        left_leg_angle = angle_calc(left_hip, left_knee, left_ankle)
-        right_leg_angle = angle_calc(right_hip, right_knee, right_ankle)
-
-        left_arm_raised = left_wrist[1] < left_shoulder[1] - torso_dist * 0.4
-        right_arm_raised = right_wrist[1] < right_shoulder[1] - torso_dist * 0.4
-
-        leg_bend_accuracy = max(0.0, 40.0 * (1.0 - abs(min(left_leg_angle, right_leg_angle) - 90) / 90.0))
-        arms_accuracy = 30.0 if (left_arm_raised or right_arm_raised) else 0.0
-        stance_accuracy = 30.0 if (abs(left_leg_angle - right_leg_angle) < 50) else 10.0
-
-        sub_scores.update({
-            'leg_bend_accuracy': leg_bend_accuracy,
-            'arms_accuracy': arms_accuracy,
-            'stance_accuracy': stance_accuracy,
-        })
-
-        accuracy = leg_bend_accuracy + arms_accuracy + stance_accuracy
-        accuracy = min(100.0, max(0.0, accuracy))
-
-    elif pose_level == 4:  # Child's Pose
-        nose = find_point(results.pose_landmarks, 0)
-        left_hip = find_point(results.pose_landmarks, 23)
-        right_hip = find_point(results.pose_landmarks, 24)
-        left_knee = find_point(results.pose_landmarks, 25)
-        right_knee = find_point(results.pose_landmarks, 26)
-
-        hip_center_y = (left_hip[1] + right_hip[1]) / 2
-
-        nose_below_hips = nose[1] > hip_center_y
-        knees_bent = left_knee[1] > (left_hip[1] + torso_dist * 0.2) and right_knee[1] > (right_hip[1] + torso_dist * 0.2)
-
-        fold_accuracy = max(0.0, 50.0 * (1.0 - max(0.0, hip_center_y - nose[1]) / (torso_dist * 0.6)))
-        knee_accuracy = 50.0 if knees_bent else max(0.0, 50.0 * (1.0 - abs(left_knee[1] - left_hip[1]) / (torso_dist * 0.6)))
-
-        sub_scores.update({
-            'fold_accuracy': fold_accuracy,
-            'knee_accuracy': knee_accuracy,
-        })
-
-        accuracy = fold_accuracy + knee_accuracy
-        accuracy = min(100.0, max(0.0, accuracy))
-
-    elif pose_level == 5:  # Lotus Pose
-        left_hip = find_point(results.pose_landmarks, 23)
-        right_hip = find_point(results.pose_landmarks, 24)
-        nose = find_point(results.pose_landmarks, 0)
-        left_shoulder = find_point(results.pose_landmarks, 11)
-        right_shoulder = find_point(results.pose_landmarks, 12)
-        left_knee = find_point(results.pose_landmarks, 25)
-        right_knee = find_point(results.pose_landmarks, 26)
-
-        hip_center_y = (left_hip[1] + right_hip[1]) / 2
-        shoulder_y = (left_shoulder[1] + right_shoulder[1]) / 2
-
-        upright_accuracy = max(0.0, 50.0 * (1.0 - abs(nose[1] - hip_center_y) / (torso_dist * 0.6)))
-        spine_accuracy = max(0.0, 30.0 * (1.0 - abs(shoulder_y - nose[1]) / (torso_dist * 0.6)))
-        legs_accuracy = 20.0 if (left_knee[1] > left_hip[1] and right_knee[1] > right_hip[1]) else 5.0
-
-        sub_scores.update({
-            'upright_accuracy': upright_accuracy,
-            'spine_accuracy': spine_accuracy,
-            'legs_accuracy': legs_accuracy,
-        })
-
-        accuracy = upright_accuracy + spine_accuracy + legs_accuracy
-        accuracy = min(100.0, max(0.0, accuracy))
-
-    is_correct = accuracy >= ACCURACY_THRESHOLD
-    if DEBUG_METRICS:
-        print(f"[ACCURACY] Level {pose_level}: {accuracy:.1f}% - {'CORRECT ✓' if is_correct else 'INCORRECT ✗'}")
-        print("[SUBSCORES]", {k: round(v, 2) for k, v in sub_scores.items()})
-
-    return is_correct, accuracy
-    
-
 def speak_level_complete(level):
     if level < 5:
         speak_text(f"Congratulations! Level {level} complete. Moving to level {level + 1}.")
     else:
         speak_text("Amazing! You've completed all levels. Well done!")
 
-def find_point(landmarks, p):
-    if p < len(landmarks.landmark):
-        landmark = landmarks.landmark[p]
-        return (int(landmark.x * width), int(landmark.y * height))
-    return (0, 0)
-
-def euclidian(point1, point2):
-    return math.sqrt((point1[0]-point2[0])**2 + (point1[1]-point2[1])**2)
-
-def angle_calc(p0, p1, p2):
-    try:
-        a = (p1[0]-p0[0])**2 + (p1[1]-p0[1])**2
-        b = (p1[0]-p2[0])**2 + (p1[1]-p2[1])**2
-        c = (p2[0]-p0[0])**2 + (p2[1]-p0[1])**2
-        angle = math.acos((a+b-c) / math.sqrt(4*a*b)) * 180/math.pi
-    except:
-        return 0
-    return int(angle)
+@lru_cache(maxsize=16)
+def gradient_background(width, height, color1, color2):
+    """Cached, read-only vertical gradient from RGB color1 (top) to color2 with faint guide lines."""
+    ratio = np.arange(height)[:, None] / height
+    column = (np.array(color1) * (1 - ratio) + np.array(color2) * ratio).astype(np.uint8)[:, None, ::-1]  # RGB -> BGR
+    column[::30] = int(255 * 0.05)
+    # widening one column with nearest-neighbour resize is much faster than a broadcast assignment
+    background = cv2.resize(np.ascontiguousarray(column), (width, height), interpolation=cv2.INTER_NEAREST)
+    background.flags.writeable = False
+    return background
 
 def create_gradient_background(width, height, color1, color2):
-    background = np.zeros((height, width, 3), dtype=np.uint8)
-    for y in range(height):
-        ratio = y / height
-        r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-        g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-        b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-        background[y, :] = [b, g, r]
-    for i in range(0, height, 30):
-        alpha = 0.05
-        cv2.line(background, (0,i), (width,i), (int(255*alpha), int(255*alpha), int(255*alpha)), 1)
-    return background
+    """Writable copy of gradient_background for callers that draw on it."""
+    return gradient_background(width, height, tuple(color1), tuple(color2)).copy()
+
+# shadowed HUD text is rasterized once per string and blended from the sprite cache afterwards
+text_renderer = TextRenderer()
 
 def draw_modern_text(img, text, position, color=(255,255,255), scale=1.0, thickness=2):
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    cv2.putText(img, text, (position[0]+2, position[1]+2), font, scale, (0,0,0), thickness+2)
-    cv2.putText(img, text, position, font, scale, color, thickness)
+    text_renderer.draw(img, text, position, color, scale, thickness)
 
 def draw_3d_cylinder(img, center, radius, height, color, thickness=-1):
     x, y = center
@@ -526,39 +350,11 @@ mp_pose = mp.solutions.pose
 
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
-pose = mp_pose.Pose(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-
-print("=== 🧘 YOGA PROGRESSION SYSTEM 🧘 ===")
-print("Complete each pose correctly to advance to the next level!")
-print("\nLevels:")
-print("1. 🏔️ Mountain Pose (Tadasana) - Foundation")
-print("2. 🌳 Tree Pose (Vrikshasana) - Balance")
-print("3. ⚔️ Warrior Pose (Virabhadrasana) - Strength")
-print("4. 👶 Child's Pose (Balasana) - Surrender")
-print("5. 🪷 Lotus Pose (Padmasana) - Meditation")
-print("\nPress 'q' to quit, 'r' to reset level")
-
-speak_text("Welcome to the Yoga Progression System. Let's start with Mountain Pose. Stand straight with your feet together and arms at your sides.")
-
-cv2.namedWindow('🧘 Yoga Progression System 🧘', cv2.WINDOW_NORMAL)
-cv2.resizeWindow('🧘 Yoga Progression System 🧘', 1280, 720)
-
-cap = cv2.VideoCapture(0)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-global height, width
-current_level = 1
-fps_time = time.time()
-pose_hold_time = 0
-pose_correct = False
-level_complete = False
-hold_required = 3.0
+
 pose_names = {1: "MOUNTAIN POSE (Tadasana)",2: "TREE POSE (Vrikshasana)",3: "WARRIOR POSE (Virabhadrasana)",4: "CHILD'S POSE (Balasana)",5: "LOTUS POSE (Padmasana)"}
 pose_instructions = {1: "Stand straight with arms at sides, feet together",2: "Balance on one leg, place foot on opposite thigh",3: "Bend one knee deeply, extend arms overhead",4: "Kneel and fold forward, arms extended",5: "Sit cross-legged with straight spine, hands on knees"}
 timing_settings = {1: 2.0,2: 3.0,3: 2.5,4: 2.0,5: 3.0}
 
-last_incorrect_feedback_time = 0
-
 # Friendly audio/text for poses (fallbacks in case resources aren't present)
 pose_sounds = {
     1: "Starting Mountain Pose",
@@ -576,9 +372,6 @@ voice_instructions = {
     5: "Sit cross-legged with a straight spine and rest your hands on your knees.",
 }
 
-# Small running history per level to smooth accuracy and reduce noise
-accuracy_history = {i: deque(maxlen=SMOOTHING_WINDOW) for i in range(1, 6)}
-
 def wrap_text(text, max_chars=40):
     words = text.split()
     lines = []
@@ -635,171 +428,392 @@ def load_pose_images():
             print(f"Warning: Unable to read pose image {path}")
     return images
 
-ensure_pose_images()
-pose_images = load_pose_images()
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-    height, width = frame.shape[:2]
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(rgb_frame)
-    if results.pose_landmarks:
-        for connection in mp_pose.POSE_CONNECTIONS:
-            start_point = results.pose_landmarks.landmark[connection[0]]
-            end_point = results.pose_landmarks.landmark[connection[1]]
-            
-            start_x = int(start_point.x * width)
-            start_y = int(start_point.y * height)
-            end_x = int(end_point.x * width)
-            end_y = int(end_point.y * height)
-            
-            cv2.line(frame, (start_x, start_y), (end_x, end_y), (50, 200, 100), 8)
-        
-        for landmark_id, landmark in enumerate(results.pose_landmarks.landmark):
-            x = int(landmark.x * width)
-            y = int(landmark.y * height)
-            if landmark_id in [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]:
-                cv2.circle(frame, (x, y), 18, (255, 100, 200), -1)
-                cv2.circle(frame, (x, y), 18, (255, 255, 255), 4)
-            else:
-                cv2.circle(frame, (x, y), 15, (100, 255, 200), -1)
-                cv2.circle(frame, (x, y), 15, (255, 255, 255), 3)
-    
-    # get raw accuracy from frame
-    is_correct_raw, accuracy = check_pose_accuracy(current_level, results)
-
-    # If no landmarks, treat as zero accuracy
-    if not results.pose_landmarks:
-        is_correct_raw = False
-        accuracy = 0.0
-        print(f"[DEBUG] No pose landmarks detected")
-    # append to smoothing history and compute smoothed accuracy (apply sensitivity calibration)
-    adjusted_accuracy = min(100.0, float(accuracy) * SENSITIVITY)
-    accuracy_history[current_level].append(adjusted_accuracy)
-    smoothed_accuracy = sum(accuracy_history[current_level]) / len(accuracy_history[current_level])
-    is_correct = smoothed_accuracy >= ACCURACY_THRESHOLD
-    print(f"[DEBUG] Level {current_level} - raw: {accuracy:.1f}%, adjusted: {adjusted_accuracy:.1f}%, smoothed: {smoothed_accuracy:.1f}% -> {'CORRECT' if is_correct else 'INCORRECT'}")
-    base_pose_img = pose_images.get(current_level)
+def render_reference_panel(level, width, height):
+    """Right-hand panel for a level: pose image, darkened instruction area, texts and border."""
+    ref_img = np.empty((height, width, 3), dtype=np.uint8)
+    base_pose_img = pose_images.get(level)
     if base_pose_img is not None:
-        ref_img = cv2.resize(base_pose_img, (width, height))
+        cv2.resize(base_pose_img, (width, height), dst=ref_img)
     else:
         # If image not available, show a simple gradient background with message
-        ref_img = create_gradient_background(width, height, (40,60,80), (20,30,40))
+        np.copyto(ref_img, gradient_background(width, height, (40,60,80), (20,30,40)))
         draw_modern_text(ref_img, "Pose image loading...", (width//2-150, height//2), (255,255,255), 1.5, 3)
 
     instruction_start_y = max(int(height * 0.55), 220)
     panel_top = max(instruction_start_y - 90, 0)
-    overlay = ref_img.copy()
-    cv2.rectangle(overlay, (0, panel_top), (width, height), (0,0,0), -1)
-    ref_img = cv2.addWeighted(overlay, 0.35, ref_img, 0.65, 0)
+    # darken the text area in place (same result as blending a black rectangle at 35%)
+    text_area = ref_img[panel_top:]
+    cv2.addWeighted(text_area, 0.65, text_area, 0.0, 0, dst=text_area)
 
-    draw_modern_text(ref_img, f"LEVEL {current_level}", (50,70), (255,255,0), 1.8, 3)
-    draw_modern_text(ref_img, pose_names[current_level], (50,110), (100,255,200), 1.4, 2)
+    draw_modern_text(ref_img, f"LEVEL {level}", (50,70), (255,255,0), 1.8, 3)
+    draw_modern_text(ref_img, pose_names[level], (50,110), (100,255,200), 1.4, 2)
 
-    instruction = pose_instructions[current_level]
+    instruction = pose_instructions[level]
     instruction_lines = wrap_text(instruction, 35)
     for i, line in enumerate(instruction_lines):
         draw_modern_text(ref_img, line, (50, instruction_start_y + i*28), (220,220,220), 0.85, 2)
 
-    draw_modern_text(ref_img, f"Hold for {timing_settings[current_level]}s", (50, instruction_start_y + len(instruction_lines)*28 + 20), (255,200,100), 1.1, 2)
+    draw_modern_text(ref_img, f"Hold for {timing_settings[level]}s", (50, instruction_start_y + len(instruction_lines)*28 + 20), (255,200,100), 1.1, 2)
 
     cv2.rectangle(ref_img, (0,0), (ref_img.shape[1]-1, ref_img.shape[0]-1), (255,255,255), 8)
+    return ref_img
+
+def run_inference(captured):
+    global pool
+    if args.inference_workers > 0:
+        # worker processes finish frames asynchronously; None means nothing is ready yet
+        if pool is None:
+            pool = InferencePool(captured.image.shape, args.inference_workers,
+                                 inference_width=args.inference_width, min_detection_confidence=args.detection_confidence,
+                                 min_tracking_confidence=args.detection_confidence, roi_tracking=args.roi_tracking,
+                                 ordered=not realtime)
+        return pool.infer(captured.image, captured)
+    if cadence is not None:
+        return captured, cadence.detect(captured.image, captured.timestamp)
+    if motion_gate is not None:
+        return captured, motion_gate.detect(captured.image, captured.timestamp)
+    return captured, detector.detect(captured.image)
+
+def drain_inference():
+    """Results of frames still in the worker pool when the source runs out, oldest first."""
+    return pool.drain() if pool is not None else []
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yoga progression system for PTSD recovery")
+    parser.add_argument("--mode", choices=["pipelined", "sync"], default="pipelined",
+                        help="pipelined: capture and inference run on worker threads; sync: single-threaded loop")
+    parser.add_argument("--inference-width", type=int, default=INFERENCE_WIDTH,
+                        help="width frames are downscaled to for pose detection (0 = full resolution)")
+    parser.add_argument("--source", default="camera",
+                        help="camera, camera:N, synthetic, a video file or a directory of images")
+    parser.add_argument("--fast", action="store_true",
+                        help="replay video/image/synthetic sources as fast as possible instead of in real time")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without opening a window (benchmarking and regression runs)")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="detect on a crop around the previous frame's skeleton instead of the full frame")
+    parser.add_argument("--adaptive-cadence", action="store_true",
+                        help="run pose detection every Nth frame and track landmarks with optical flow in between")
+    parser.add_argument("--display-rate", action="store_true",
+                        help="draw every camera frame, interpolating the skeleton between pose results (pipelined mode)")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="skip pose detection while the picture is still and reuse the last landmarks")
+    parser.add_argument("--skeleton-detail", choices=list(DETAIL_LEVELS), default="full",
+                        help="overlay detail: full skeleton, body (no face/hand points) or bones only")
+    parser.add_argument("--inference-workers", type=int, default=0,
+                        help="run pose detection in this many worker processes (0 = in the main process)")
+    parser.add_argument("--auto-detect", action="store_true",
+                        help="recognize which pose the user is in instead of following the level order ('a' toggles)")
+    parser.add_argument("--scorer", choices=["rules", "templates"], default="rules",
+                        help="rules: per-pose angle and distance checks; templates: match against reference skeletons")
+    parser.add_argument("--templates", default=str(DEFAULT_TEMPLATES),
+                        help="template file written by extract_reference_landmarks.py (for --scorer templates)")
+    parser.add_argument("--pose-index", nargs="?", const=str(DEFAULT_INDEX),
+                        help="show the closest pose from a catalog built with extract_reference_landmarks.py --index")
+    parser.add_argument("--landmark-filter", action=argparse.BooleanOptionalAction, default=True,
+                        help="smooth landmark jitter with a One-Euro filter before scoring and drawing")
+    parser.add_argument("--detection-confidence", type=float, default=0.7,
+                        help="MediaPipe detection/tracking confidence; can be lowered with the landmark filter on")
+    parser.add_argument("--max-frames", type=int, default=0, help="stop after this many frames (0 = no limit)")
+    args = parser.parse_args()
+
+    detector = None
+    cadence = None
+    motion_gate = None
+    pool = None
+    if args.inference_workers > 0:
+        if args.adaptive_cadence:
+            print("Warning: --adaptive-cadence is not supported with --inference-workers, ignoring it")
+        if args.motion_gate:
+            print("Warning: --motion-gate is not supported with --inference-workers, ignoring it")
+    else:
+        detector = PoseDetector(args.inference_width, min_detection_confidence=args.detection_confidence,
+                                min_tracking_confidence=args.detection_confidence,
+                                roi_tracking=args.roi_tracking)
+        cadence = AdaptiveCadence(detector) if args.adaptive_cadence else None
+        if args.motion_gate:
+            if cadence is not None:
+                print("Warning: --motion-gate is not needed with --adaptive-cadence, ignoring it")
+            else:
+                motion_gate = MotionGate(detector)
+
+    score_pose = check_pose_accuracy
+    if args.scorer == "templates":
+        if Path(args.templates).exists():
+            score_pose = PoseTemplates.load(args.templates).check_pose_accuracy
+        else:
+            print(f"Warning: template file {args.templates} not found, using rule-based scoring")
+
+    pose_index = None
+    if args.pose_index is not None:
+        if Path(args.pose_index).exists():
+            pose_index = PoseIndex.load(args.pose_index)
+        else:
+            print(f"Warning: pose index {args.pose_index} not found, not showing catalog matches")
+
+    print("=== 🧘 YOGA PROGRESSION SYSTEM 🧘 ===")
+    print("Complete each pose correctly to advance to the next level!")
+    print("\nLevels:")
+    print("1. 🏔️ Mountain Pose (Tadasana) - Foundation")
+    print("2. 🌳 Tree Pose (Vrikshasana) - Balance")
+    print("3. ⚔️ Warrior Pose (Virabhadrasana) - Strength")
+    print("4. 👶 Child's Pose (Balasana) - Surrender")
+    print("5. 🪷 Lotus Pose (Padmasana) - Meditation")
+    print("\nPress 'q' to quit, 'r' to reset level, 'a' to toggle pose auto-detection")
+
+    speak_text("Welcome to the Yoga Progression System. Let's start with Mountain Pose. Stand straight with your feet together and arms at your sides.")
+
+    if not args.headless:
+        cv2.namedWindow('🧘 Yoga Progression System 🧘', cv2.WINDOW_NORMAL)
+        cv2.resizeWindow('🧘 Yoga Progression System 🧘', 1280, 720)
+
+    cap = open_frame_source(args.source, realtime=not args.fast)
+    # live sources drop stale frames; unpaced (--fast) replays process every frame so runs are repeatable
+    realtime = getattr(cap, "realtime", True)
+    global height, width
+    current_level = 1
+    fps_time = time.time()
+    hold_timer = HoldTimer()
+    pose_correct = False
+    level_complete = False
+    hold_required = 3.0
+    last_incorrect_feedback_time = None
+
+    # Per-level moving average of accuracy to reduce noise. It and the hold timer
+    # run on the frames' timestamps, so recorded sessions replay at any speed.
+    smoother = AccuracySmoother(SMOOTHING_SECONDS)
+
+    # auto-detect mode scores every level each frame and follows whichever pose the user holds
+    # only poses the UI has names, prompts and hold times for (POSE_CONFIG may define more)
+    recognizer = PoseRecognizer(levels=sorted(pose_names))
+    landmark_filter = OneEuroFilter() if args.landmark_filter else None
+    auto_detect = args.auto_detect
+
+    ensure_pose_images()
+    pose_images = load_pose_images()
+
+    dropped_frames = 0
+    leftover = None  # sync mode: pool results collected after the source ran out
+    frames_processed = 0
+    run_start = time.monotonic()
+    arena = FrameArena()
+    panel_cache = LayerCache(render_reference_panel)
+    skeleton_renderer = SkeletonRenderer(args.skeleton_detail)
+    pipeline = None
+    interpolator = None
+    if args.mode == "pipelined":
+        if args.display_rate and not realtime:
+            # a replay waits for every result, so there is nothing to interpolate over
+            print("Warning: --display-rate is for live sources, ignoring it with --fast")
+        elif args.display_rate:
+            # render at camera rate; pose results arrive in between and are interpolated
+            interpolator = LandmarkInterpolator()
+        pipeline = FramePipeline(cap, run_inference, queue_size=PIPELINE_QUEUE_SIZE,
+                                 policy=DROP_OLDEST if realtime else BLOCK,
+                                 present=interpolator is not None, flush=drain_inference).start()
+    elif args.display_rate:
+        print("Warning: --display-rate needs --mode pipelined, ignoring it")
+
+    while True:
+        if interpolator is not None:
+            captured = pipeline.get_frame()
+            packet = None
+            if captured is not None:
+                for result_frame, result in pipeline.poll():
+                    if landmark_filter is not None:
+                        result = landmark_filter(result, result_frame.timestamp)
+                    interpolator.push(result, result_frame.timestamp)
+                packet = captured, interpolator.at(captured.timestamp)
+        elif pipeline is not None:
+            packet = pipeline.get()
+        else:
+            packet = None
+            while packet is None and leftover is None:
+                captured = cap.read()
+                if captured is None:
+                    leftover = drain_inference()
+                else:
+                    packet = run_inference(captured)
+            if packet is None and leftover:
+                packet = leftover.pop(0)
+        if packet is None:
+            break
+        captured, detected = packet
+        now = captured.timestamp
+        dropped_frames += captured.dropped
+        frames_processed += 1
+        height, width = captured.image.shape[:2]
+        # draw straight into the left half of the persistent side-by-side canvas
+        arena.ensure(height, width)
+        frame = arena.live
+        np.copyto(frame, captured.image)
+        if landmark_filter is not None and interpolator is None:
+            detected = landmark_filter(detected, captured.timestamp)
+        # one (33, 4) array per frame; scoring and drawing both read from it
+        landmarks = LandmarkFrame(detected, width, height) if detected is not None else None
+        # derived geometry, computed lazily once and shared by scoring, feedback and drawing
+        features = PoseFeatures(landmarks) if landmarks is not None else None
+        if features is not None:
+            skeleton_renderer.draw(frame, features.draw_points, landmarks.visibility)
     
-    if is_correct:
-        cv2.rectangle(frame, (0,0), (frame.shape[1]-1, frame.shape[0]-1), (0, 255, 0), 15)
-        if not pose_correct:
-            pose_hold_time = time.time()
-            pose_correct = True
-            speak_pose_feedback(True, current_level, results)
-        hold_duration = time.time() - pose_hold_time
-        required_time = timing_settings[current_level]
-        time_remaining = max(0, required_time - hold_duration)
-        progress = min(100, (hold_duration / required_time) * 100)
-
-        draw_modern_text(frame, f"Accuracy: {smoothed_accuracy:.0f}%", (width//2-120, height//2-120), (100,255,100), 1.4, 2)
-
-        if hold_duration >= required_time and not level_complete:
-            level_complete = True
-            speak_level_complete(current_level)
-            if current_level < 5:
-                current_level += 1
+        if auto_detect:
+            recognized_level, recognition_confidence = recognizer.update(features)
+            if DEBUG_METRICS:
+                print("[RECOGNIZER]", dict(zip(recognizer.levels, recognizer.scores.round(1).tolist())))
+            if recognized_level is not None and recognized_level != current_level:
+                current_level = recognized_level
                 pose_correct = False
                 level_complete = False
-                print(f"🎉 LEVEL {current_level-1} COMPLETE! Moving to Level {current_level}")
+                print(f"Auto-detected Level {current_level} ({recognition_confidence:.0%} of recent frames)")
                 speak_text(pose_sounds[current_level])
-                speak_text(voice_instructions[current_level])
-                for i in range(10):
-                    cv2.circle(frame, (width//2, height//2), 50 + i*10, (0,255,0), 3)
+
+        # get raw accuracy from frame
+        is_correct_raw, accuracy, sub_scores = score_pose(current_level, features, debug=DEBUG_METRICS)
+
+        # If no landmarks, treat as zero accuracy
+        if landmarks is None:
+            is_correct_raw = False
+            accuracy = 0.0
+            print(f"[DEBUG] No pose landmarks detected")
+        # append to smoothing history and compute smoothed accuracy (apply sensitivity calibration)
+        adjusted_accuracy = min(100.0, float(accuracy) * SENSITIVITY)
+        smoothed_accuracy = smoother.update(current_level, adjusted_accuracy, now)
+        is_correct = smoothed_accuracy >= ACCURACY_THRESHOLD
+        print(f"[DEBUG] Level {current_level} - raw: {accuracy:.1f}%, adjusted: {adjusted_accuracy:.1f}%, smoothed: {smoothed_accuracy:.1f}% -> {'CORRECT' if is_correct else 'INCORRECT'}")
+        # the reference panel only changes with the level or the frame size, so it is drawn once and copied
+        np.copyto(arena.panel, panel_cache.get((current_level, width, height)))
+    
+        if is_correct:
+            cv2.rectangle(frame, (0,0), (frame.shape[1]-1, frame.shape[0]-1), (0, 255, 0), 15)
+            if not pose_correct:
+                hold_timer.start(now)
+                pose_correct = True
+                speak_pose_feedback(True, current_level)
+            hold_duration = hold_timer.elapsed(now)
+            required_time = timing_settings[current_level]
+            time_remaining = max(0, required_time - hold_duration)
+            progress = min(100, (hold_duration / required_time) * 100)
+
+            draw_modern_text(frame, f"Accuracy: {smoothed_accuracy:.0f}%", (width//2-120, height//2-120), (100,255,100), 1.4, 2)
+
+            if hold_duration >= required_time and not level_complete:
+                level_complete = True
+                speak_level_complete(current_level)
+                if auto_detect:
+                    # recognition decides the next pose; stay here until the user changes it
+                    print(f"🎉 LEVEL {current_level} COMPLETE!")
+                elif current_level < 5:
+                    current_level += 1
+                    pose_correct = False
+                    level_complete = False
+                    print(f"🎉 LEVEL {current_level-1} COMPLETE! Moving to Level {current_level}")
+                    speak_text(pose_sounds[current_level])
+                    speak_text(voice_instructions[current_level])
+                    for i in range(10):
+                        cv2.circle(frame, (width//2, height//2), 50 + i*10, (0,255,0), 3)
+                else:
+                    # Celebrate and restart the progression instead of quitting the program
+                    print("🎉 CONGRATULATIONS! You've completed all levels! Restarting from Level 1.")
+                    speak_text("Congratulations! You have completed all levels. Restarting from Level 1.")
+                    # celebratory animation
+                    for i in range(20):
+                        cv2.circle(frame, (width//2, height//2), 50 + i*8, (0,255,0), 3)
+                    draw_modern_text(frame, "🎉 ALL LEVELS COMPLETE! Restarting... 🎉", (width//2-260, height//2), (0,255,0), 1.3, 2)
+                    # reset to initial state so user can continue practicing
+                    current_level = 1
+                    pose_correct = False
+                    level_complete = False
             else:
-                # Celebrate and restart the progression instead of quitting the program
-                print("🎉 CONGRATULATIONS! You've completed all levels! Restarting from Level 1.")
-                speak_text("Congratulations! You have completed all levels. Restarting from Level 1.")
-                # celebratory animation
-                for i in range(20):
-                    cv2.circle(frame, (width//2, height//2), 50 + i*8, (0,255,0), 3)
-                draw_modern_text(frame, "🎉 ALL LEVELS COMPLETE! Restarting... 🎉", (width//2-260, height//2), (0,255,0), 1.3, 2)
-                # reset to initial state so user can continue practicing
-                current_level = 1
-                pose_correct = False
-                level_complete = False
+                if time_remaining > 0:
+                    draw_modern_text(frame, f"Hold: {time_remaining:.1f}s", (width//2-120, height//2-40), (100,255,100), 1.5, 3)
+                else:
+                    draw_modern_text(frame, "Perfect! Hold this pose!", (width//2-180, height//2-40), (100,255,100), 1.5, 3)
+            last_incorrect_feedback_time = None
         else:
-            if time_remaining > 0:
-                draw_modern_text(frame, f"Hold: {time_remaining:.1f}s", (width//2-120, height//2-40), (100,255,100), 1.5, 3)
-            else:
-                draw_modern_text(frame, "Perfect! Hold this pose!", (width//2-180, height//2-40), (100,255,100), 1.5, 3)
-        last_incorrect_feedback_time = 0
-    else:
-        cv2.rectangle(frame, (0,0), (frame.shape[1]-1, frame.shape[0]-1), (0, 0, 255), 15)
-        now = time.time()
-        if pose_correct:
-            speak_pose_feedback(False, current_level, results)
-            last_incorrect_feedback_time = now
-        elif last_incorrect_feedback_time == 0 or (now - last_incorrect_feedback_time) > 2.0:
-            speak_pose_feedback(False, current_level, results)
-            last_incorrect_feedback_time = now
-        pose_correct = False
-        level_complete = False
-        draw_modern_text(frame, f"Accuracy: {smoothed_accuracy:.0f}%", (width//2-120, height//2-120), (100,150,255), 1.4, 2)
-        draw_modern_text(frame, "Adjust your pose", (width//2-140, height//2-40), (100,200,255), 1.3, 2)
+            cv2.rectangle(frame, (0,0), (frame.shape[1]-1, frame.shape[0]-1), (0, 0, 255), 15)
+            if pose_correct:
+                speak_pose_feedback(False, current_level, sub_scores)
+                last_incorrect_feedback_time = now
+            elif last_incorrect_feedback_time is None or (now - last_incorrect_feedback_time) > 2.0:
+                speak_pose_feedback(False, current_level, sub_scores)
+                last_incorrect_feedback_time = now
+            pose_correct = False
+            level_complete = False
+            draw_modern_text(frame, f"Accuracy: {smoothed_accuracy:.0f}%", (width//2-120, height//2-120), (100,150,255), 1.4, 2)
+            draw_modern_text(frame, "Adjust your pose", (width//2-140, height//2-40), (100,200,255), 1.3, 2)
     
-    fps = 1.0 / (time.time() - fps_time)
-    draw_modern_text(frame, f"FPS: {fps:.1f}", (width-150, height-40), (100,200,255), 1.0, 2)
-    draw_modern_text(frame, "Press 'r' to reset, 'q' to quit", (width-280, height-80), (200,200,200), 0.8, 2)
+        fps = 1.0 / (time.time() - fps_time)
+        draw_modern_text(frame, f"FPS: {fps:.1f}", (width-150, height-40), (100,200,255), 1.0, 2)
+        draw_modern_text(frame, "Press 'r' to reset, 'q' to quit", (width-280, height-80), (200,200,200), 0.8, 2)
     
-    draw_modern_text(frame, f"Level {current_level}", (50, 70), (255,255,100), 1.3, 2)
-    draw_modern_text(frame, pose_names[current_level], (50, 105), (100,255,200), 1.1, 2)
-    combined_img = np.hstack((frame, ref_img))
-    cv2.rectangle(combined_img, (0,0), (combined_img.shape[1]-1, combined_img.shape[0]-1), (100,150,200), 2)
-    cv2.line(combined_img, (width, 0), (width, height), (200,200,200), 4)
-    cv2.rectangle(combined_img, (0, 0), (combined_img.shape[1], 45), (30,30,40), -1)
-    draw_modern_text(combined_img, "🧘 YOGA PROGRESSION SYSTEM 🧘", (combined_img.shape[1]//2-240, 28), (100,255,200), 1.1, 2)
+        draw_modern_text(frame, f"Level {current_level}", (50, 70), (255,255,100), 1.3, 2)
+        draw_modern_text(frame, pose_names[current_level], (50, 105), (100,255,200), 1.1, 2)
+        if auto_detect:
+            draw_modern_text(frame, f"Auto-detect {recognizer.confidence:.0%}", (50, 140), (255,200,100), 0.9, 2)
+        if pose_index is not None and features is not None:
+            closest = pose_index.search(features.points, k=1)
+            if closest:
+                draw_modern_text(frame, f"Closest: {closest[0][1]}", (50, 175), (200,200,255), 0.9, 2)
+        combined_img = arena.canvas
+        cv2.rectangle(combined_img, (0,0), (combined_img.shape[1]-1, combined_img.shape[0]-1), (100,150,200), 2)
+        cv2.line(combined_img, (width, 0), (width, height), (200,200,200), 4)
+        cv2.rectangle(combined_img, (0, 0), (combined_img.shape[1], 45), (30,30,40), -1)
+        draw_modern_text(combined_img, "🧘 YOGA PROGRESSION SYSTEM 🧘", (combined_img.shape[1]//2-240, 28), (100,255,200), 1.1, 2)
     
-    cv2.imshow('🧘 Yoga Progression System 🧘', combined_img)
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('q'):
-        break
-    elif key == ord('r'):
-        current_level = 1
-        pose_correct = False
-        level_complete = False
-        print("Reset to Level 1")
-        speak_text("Reset to Level 1. Mountain Pose. Stand straight with your feet together and arms at your sides.")
-    elif key == ord('d'):
-        # toggle verbose metric logging
-        DEBUG_METRICS = not DEBUG_METRICS
-        print(f"DEBUG_METRICS = {DEBUG_METRICS}")
-        speak_text(f"Debug metrics {'enabled' if DEBUG_METRICS else 'disabled'}")
-    elif key in [ord(str(i)) for i in range(1,6)]:
-        new_level = int(chr(key))
-        if 1 <= new_level <= 5:
-            current_level = new_level
+        if args.max_frames and frames_processed >= args.max_frames:
+            break
+        if args.headless:
+            continue
+        cv2.imshow('🧘 Yoga Progression System 🧘', combined_img)
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        elif key == ord('r'):
+            current_level = 1
             pose_correct = False
             level_complete = False
-            print(f"Manually switched to Level {current_level}")
-            speak_text(pose_sounds[current_level])
-            speak_text(voice_instructions[current_level])
-cap.release()
-cv2.destroyAllWindows() 
-cleanup_speech() 
\ No newline at end of file
+            print("Reset to Level 1")
+            speak_text("Reset to Level 1. Mountain Pose. Stand straight with your feet together and arms at your sides.")
+        elif key == ord('d'):
+            # toggle verbose metric logging
+            DEBUG_METRICS = not DEBUG_METRICS
+            print(f"DEBUG_METRICS = {DEBUG_METRICS}")
+            speak_text(f"Debug metrics {'enabled' if DEBUG_METRICS else 'disabled'}")
+        elif key == ord('a'):
+            auto_detect = not auto_detect
+            recognizer.reset()
+            print(f"Pose auto-detection {'enabled' if auto_detect else 'disabled'}")
+            speak_text(f"Pose auto detection {'enabled' if auto_detect else 'disabled'}")
+        elif key in [ord(str(i)) for i in range(1,6)]:
+            new_level = int(chr(key))
+            if 1 <= new_level <= 5:
+                current_level = new_level
+                pose_correct = False
+                level_complete = False
+                print(f"Manually switched to Level {current_level}")
+                speak_text(pose_sounds[current_level])
+                speak_text(voice_instructions[current_level])
+    if pipeline is not None:
+        # the capture stage may still be inside cap.read(), and the inference stage inside the
+        # worker pool (up to its task timeout); join both before releasing the source and the pool
+        pipeline.stop(timeout=None if pool is not None else 1.0)
+        print("[PIPELINE] stage ms:", {k: round(v, 2) for k, v in pipeline.stats().items()})
+        dropped_frames += pipeline.skipped
+    cap.release()
+    if pool is not None:
+        dropped_frames += pool.rejected + pool.discarded
+    elapsed = time.monotonic() - run_start
+    print(f"Processed {frames_processed} frames in {elapsed:.1f}s "
+          f"({frames_processed / max(elapsed, 1e-6):.1f} FPS), skipped {dropped_frames} stale frames")
+    if pool is not None:
+        print(f"[POOL] {pool.submitted} frames submitted, {pool.rejected} rejected while busy, "
+              f"{pool.discarded} superseded, {pool.restarts} worker restarts")
+        pool.close()
+    if cadence is not None:
+        print(f"[CADENCE] {cadence.inferences} inferences, {cadence.propagations} optical-flow frames")
+    if motion_gate is not None:
+        print(f"[MOTION] {motion_gate.inferences} inferences, {motion_gate.skipped} skipped on still frames")
+    if detector is not None:
+        detector.close()
+    cv2.destroyAllWindows() 
+    cleanup_speech() 
\ No newline at end of file
@@ -0,0 +1,69 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Skips pose detection while the scene is still and reuses the last landmarks.
+
+    Every frame is shrunk to a `width`-pixel-wide grayscale thumbnail (a few
+    hundred microseconds for full HD, against tens of milliseconds for
+    pose.process) and compared with the thumbnail of the last frame that went
+    through detection. Comparing against that frame
+    rather than the previous one means slow drift still adds up and triggers
+    detection. When fewer than `min_changed` of the pixels differ by more than
+    `pixel_threshold` grey levels, the previous result is returned instead.
+    The reused result is never older than `max_staleness` seconds.
+    """
+
+    def __init__(self, detector, width=64, pixel_threshold=15, min_changed=0.01, max_staleness=1.0):
+        self.detector = detector
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.max_staleness = max_staleness
+        self.inferences = 0
+        self.skipped = 0
+        self._sampled = None
+        self._small = None
+        self._gray = None
+        self._reference = None
+        self._diff = None
+        self._landmarks = None
+        self._inferred_at = None
+
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(self.width * h / w)))
+        if self._small is None or self._small.shape[1::-1] != size:
+            self._sampled = np.empty((size[1] * 4, size[0] * 4, 3), dtype=np.uint8)
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._reference = np.empty_like(self._gray)
+            self._diff = np.empty_like(self._gray)
+            self._inferred_at = None
+        # point-sample to 4x the thumbnail first: INTER_AREA straight from full HD costs milliseconds
+        cv2.resize(frame, self._sampled.shape[1::-1], dst=self._sampled, interpolation=cv2.INTER_NEAREST)
+        cv2.resize(self._sampled, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def changed_fraction(self):
+        cv2.absdiff(self._gray, self._reference, dst=self._diff)
+        return np.count_nonzero(self._diff > self.pixel_threshold) / self._diff.size
+
+    def detect(self, frame, timestamp=None):
+        """(33, 4) landmarks or None, fresh or reused from the last still frame."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        self._thumbnail(frame)
+        if (self._inferred_at is not None and timestamp - self._inferred_at <= self.max_staleness
+                and self.changed_fraction() < self.min_changed):
+            self.skipped += 1
+            return None if self._landmarks is None else self._landmarks.copy()
+
+        self._landmarks = self.detector.detect(frame)
+        self._inferred_at = timestamp
+        np.copyto(self._reference, self._gray)
+        self.inferences += 1
+        return None if self._landmarks is None else self._landmarks.copy()
@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import deque
+
+
+BLOCK = "block"               # producer waits for room (backpressure)
+DROP_OLDEST = "drop_oldest"   # newest item evicts the oldest queued one
+DROP_NEWEST = "drop_newest"   # incoming item is discarded while the queue is full
+
+
+class BoundedQueue:
+    """Small thread-safe queue with an explicit policy for when it is full."""
+
+    def __init__(self, maxsize=1, policy=DROP_OLDEST):
+        if policy not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item, timeout=None):
+        """Returns True if the item was queued, False if it was dropped."""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.dropped += 1
+                            return False
+                        self._cond.wait(remaining)
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Returns the next item, or None once the queue is closed and drained."""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class PipelineStage(threading.Thread):
+    """Worker thread applying fn to every item from inbox and pushing the result to outbox.
+
+    A stage without an inbox is a source: fn() is called repeatedly until it returns None.
+    fn may also return None for a regular item to filter it out. When the input
+    runs out (not on stop()), the outputs of flush(), if given, are pushed last.
+    """
+
+    def __init__(self, name, fn, inbox, outbox, flush=None):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.flush = flush
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.busy_time = 0.0
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                if self.inbox is None:
+                    start = time.perf_counter()
+                    out = self.fn()
+                    if out is None:
+                        break
+                else:
+                    item = self.inbox.get(timeout=0.1)
+                    if item is None:
+                        if self.inbox.closed:
+                            break
+                        continue
+                    start = time.perf_counter()
+                    out = self.fn(item)
+                self.busy_time += time.perf_counter() - start
+                self.processed += 1
+                if out is not None:
+                    self.outbox.put(out)
+            if self.flush is not None and not self._stop_event.is_set():
+                for out in self.flush():
+                    self.outbox.put(out)
+        except Exception as exc:
+            self.error = exc
+            print(f"[PIPELINE] Stage '{self.name}' failed: {exc}")
+        finally:
+            self.outbox.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def avg_ms(self):
+        return 1000.0 * self.busy_time / self.processed if self.processed else 0.0
+
+
+class FramePipeline:
+    """capture -> inference pipeline feeding the render loop on the calling thread.
+
+    Each stage runs on its own worker and hands work on through a bounded
+    queue, so the frame rate is set by the slowest stage instead of the sum of
+    all of them. With the default drop-oldest policy the render loop always
+    receives the freshest inference result; with BLOCK every captured frame
+    is processed (offline replay and benchmarks).
+
+    With present=True every captured frame is also put on a display queue.
+    The render loop then runs at camera rate on get_frame(), and collects
+    inference results as they complete with poll().
+    """
+
+    def __init__(self, source, infer, queue_size=1, policy=DROP_OLDEST, present=False, flush=None):
+        self.source = source
+        self.frames = BoundedQueue(queue_size, policy)
+        self.results = BoundedQueue(queue_size if not present else 8, policy)
+        self.display = BoundedQueue(1, policy) if present else None
+        self.stages = [
+            PipelineStage("capture", self._capture if present else source.read, None, self.frames),
+            PipelineStage("inference", infer, self.frames, self.results, flush),
+        ]
+
+    def _capture(self):
+        frame = self.source.read()
+        if frame is None:
+            self.display.close()
+        else:
+            self.display.put(frame)
+        return frame
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def get(self, timeout=None):
+        """Next inference output, or None once the source is exhausted."""
+        return self.results.get(timeout)
+
+    def get_frame(self, timeout=None):
+        """Newest captured frame (present=True only), or None once the source is exhausted."""
+        return self.display.get(timeout)
+
+    def poll(self):
+        """Inference outputs finished since the last call, oldest first, without waiting."""
+        outputs = []
+        while True:
+            output = self.results.get(timeout=0)
+            if output is None:
+                return outputs
+            outputs.append(output)
+
+    def stop(self, timeout=1.0):
+        """Stops and joins the stages; timeout=None waits until each has finished its current item."""
+        for stage in self.stages:
+            stage.stop()
+        self.frames.close()
+        self.results.close()
+        if self.display is not None:
+            self.display.close()
+        for stage in self.stages:
+            stage.join(timeout=timeout)
+
+    @property
+    def skipped(self):
+        """Captured frames the render loop never received."""
+        if self.display is not None:
+            return self.display.dropped
+        return self.frames.dropped + self.results.dropped
+
+    def stats(self):
+        stats = {stage.name: stage.avg_ms for stage in self.stages}
+        stats["dropped"] = self.frames.dropped + self.results.dropped
+        if self.display is not None:
+            stats["display_dropped"] = self.display.dropped
+        return stats
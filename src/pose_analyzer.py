@@ -0,0 +1,151 @@
+import numpy as np
+
+from pose_features import PoseFeatures
+from pose_rules import compile_pose_config
+
+
+ACCURACY_THRESHOLD = 55.0
+
+# Shared rule expressions (see pose_rules.py for the expression language).
+# Landmarks: 0 nose, 11/12 shoulders, 15/16 wrists, 23/24 hips, 25/26 knees,
+# 27/28 ankles; y grows downwards.
+HIP_CENTER_Y = ('mid_y', 23, 24)
+SHOULDER_Y = ('mid_y', 11, 12)
+LEFT_LEG_ANGLE = ('angle', 23, 25, 27)
+RIGHT_LEG_ANGLE = ('angle', 24, 26, 28)
+HIP_ANKLE_L = ('dist', 23, 27)
+HIP_ANKLE_R = ('dist', 24, 28)
+LEFT_LEG_RAISED = ('lt', ('y', 27), ('sub', ('y', 23), ('torso', 0.35)))
+RIGHT_LEG_RAISED = ('lt', ('y', 28), ('sub', ('y', 24), ('torso', 0.35)))
+
+
+POSE_CONFIG = {
+    1: {  # Mountain
+        'terms': [
+            {'name': 'feet_score', 'kind': 'band', 'weight': 50.0,
+             'value': ('abs', ('sub', ('x', 27), ('x', 28))), 'tolerance': ('torso', 0.6)},
+            {'name': 'shoulder_score', 'kind': 'band', 'weight': 20.0,
+             'value': ('abs', ('sub', ('x', 11), ('x', 12))), 'tolerance': ('torso', 0.9)},
+            {'name': 'left_arm_score', 'kind': 'band', 'weight': 15.0,
+             'value': ('angle', 15, 11, 13), 'target': 170.0, 'tolerance': 40.0},
+            {'name': 'right_arm_score', 'kind': 'band', 'weight': 15.0,
+             'value': ('angle', 16, 12, 14), 'target': 170.0, 'tolerance': 40.0},
+        ],
+    },
+    2: {  # Tree
+        'terms': [
+            {'name': 'leg_accuracy', 'kind': 'flag', 'weight': 40.0,
+             'when': ('or', LEFT_LEG_RAISED, RIGHT_LEG_RAISED)},
+            {'name': 'balance_accuracy', 'kind': 'band', 'weight': 30.0,
+             'value': ('sub', HIP_ANKLE_L, HIP_ANKLE_R), 'tolerance': ('torso', 0.6)},
+            # hip-ankle length of the raised leg, or the longer one when neither is raised
+            {'name': 'standing_accuracy', 'kind': 'band', 'weight': 30.0,
+             'value': ('select', LEFT_LEG_RAISED, HIP_ANKLE_L,
+                       ('select', RIGHT_LEG_RAISED, HIP_ANKLE_R, ('max', HIP_ANKLE_L, HIP_ANKLE_R))),
+             'target': ('torso', 0.75), 'tolerance': ('torso', 0.75)},
+        ],
+    },
+    3: {  # Warrior
+        'terms': [
+            {'name': 'leg_bend_accuracy', 'kind': 'band', 'weight': 40.0,
+             'value': ('min', LEFT_LEG_ANGLE, RIGHT_LEG_ANGLE), 'target': 90.0, 'tolerance': 90.0},
+            {'name': 'arms_accuracy', 'kind': 'flag', 'weight': 30.0,
+             'when': ('or', ('lt', ('y', 15), ('sub', ('y', 11), ('torso', 0.4))),
+                      ('lt', ('y', 16), ('sub', ('y', 12), ('torso', 0.4))))},
+            {'name': 'stance_accuracy', 'kind': 'flag', 'weight': 30.0, 'otherwise': 10.0,
+             'when': ('lt', ('abs', ('sub', LEFT_LEG_ANGLE, RIGHT_LEG_ANGLE)), 50.0)},
+        ],
+    },
+    4: {  # Child
+        'terms': [
+            # only penalizes the nose being above the hips
+            {'name': 'fold_accuracy', 'kind': 'band', 'weight': 50.0,
+             'value': ('relu', ('sub', HIP_CENTER_Y, ('y', 0))), 'tolerance': ('torso', 0.6)},
+            {'name': 'knee_accuracy', 'kind': 'flag', 'weight': 50.0,
+             'when': ('and', ('gt', ('y', 25), ('add', ('y', 23), ('torso', 0.2))),
+                      ('gt', ('y', 26), ('add', ('y', 24), ('torso', 0.2)))),
+             'otherwise': {'name': 'knee_drop', 'kind': 'band', 'weight': 50.0,
+                           'value': ('sub', ('y', 25), ('y', 23)), 'tolerance': ('torso', 0.6)}},
+        ],
+    },
+    5: {  # Lotus
+        'terms': [
+            {'name': 'upright_accuracy', 'kind': 'band', 'weight': 50.0,
+             'value': ('sub', ('y', 0), HIP_CENTER_Y), 'tolerance': ('torso', 0.6)},
+            {'name': 'spine_accuracy', 'kind': 'band', 'weight': 30.0,
+             'value': ('sub', SHOULDER_Y, ('y', 0)), 'tolerance': ('torso', 0.6)},
+            {'name': 'legs_accuracy', 'kind': 'flag', 'weight': 20.0, 'otherwise': 5.0,
+             'when': ('and', ('gt', ('y', 25), ('y', 23)), ('gt', ('y', 26), ('y', 24)))},
+        ],
+    },
+}
+
+# one vectorized evaluator per level, built once at import
+COMPILED_POSES = compile_pose_config(POSE_CONFIG)
+
+
+def check_pose_accuracy(pose_level, landmarks, debug=False):
+    """Scores a frame against a level; returns (is_correct, accuracy, sub_scores).
+
+    landmarks is the frame's PoseFeatures (the result is cached on it) or a
+    bare LandmarkFrame.
+    """
+    if landmarks is None:
+        return False, 0.0, {}
+    features = landmarks if isinstance(landmarks, PoseFeatures) else PoseFeatures(landmarks)
+
+    key = ('score', pose_level)
+    if key not in features.cache:
+        accuracy = 0.0
+        sub_scores = {}
+        pose = COMPILED_POSES.get(pose_level)
+        if pose is not None:
+            scores, terms = pose.evaluate_for(features)
+            accuracy = float(scores)
+            sub_scores = {name: float(value) for name, value in terms.items()}
+        features.cache[key] = (accuracy >= ACCURACY_THRESHOLD, accuracy, sub_scores)
+    is_correct, accuracy, sub_scores = features.cache[key]
+
+    if debug:
+        print(f"[ACCURACY] Level {pose_level}: {accuracy:.1f}% - {'CORRECT ✓' if is_correct else 'INCORRECT ✗'}")
+        print("[SUBSCORES]", {k: round(v, 2) for k, v in sub_scores.items()})
+        print("[FEATURES]", features.summary())
+
+    return is_correct, accuracy, sub_scores
+
+
+def weakest_term(pose_level, sub_scores):
+    """Name of the term losing the largest share of its weight, or None."""
+    weights = {term['name']: term['weight'] for term in POSE_CONFIG.get(pose_level, {}).get('terms', [])}
+    losses = {name: 1.0 - score / weights[name] for name, score in sub_scores.items() if weights.get(name)}
+    if not losses:
+        return None
+    name = max(losses, key=losses.get)
+    return name if losses[name] > 0 else None
+
+
+def score_batch(landmarks, width, height, levels=None):
+    """Scores many frames against many levels in one pass.
+
+    landmarks is (N, 33, 4) normalized (as stored by analyze_video), width and
+    height the frame size as scalars or (N,) arrays. Returns (scores (N, L),
+    {level: {term name: (N,)}}) with columns in `levels` order (every level in
+    POSE_CONFIG by default). Frames with NaN landmarks score NaN.
+    """
+    levels = sorted(COMPILED_POSES) if levels is None else list(levels)
+    data = np.asarray(landmarks, dtype=np.float64)
+    size = np.stack(np.broadcast_arrays(np.asarray(width, dtype=np.float64),
+                                        np.asarray(height, dtype=np.float64)), axis=-1)
+    pixels = data[..., :2] * size[..., None, :]
+    missing = np.isnan(pixels).any(axis=(-2, -1))
+
+    scores = np.empty(data.shape[:-2] + (len(levels),))
+    sub_scores = {}
+    for column, level in enumerate(levels):
+        accuracy, terms = COMPILED_POSES[level].evaluate(pixels, width, height)
+        scores[..., column] = accuracy
+        for values in terms.values():
+            values[missing] = np.nan
+        sub_scores[level] = terms
+    scores[missing] = np.nan
+    return scores, sub_scores
@@ -0,0 +1,103 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from roi import RoiTracker
+
+
+NUM_LANDMARKS = 33
+
+
+def landmarks_to_array(pose_landmarks):
+    """(33, 4) float32 array of normalized x, y, z, visibility."""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark], dtype=np.float32)
+
+
+class PoseDetector:
+    """MediaPipe Pose running on a downscaled copy of the frame.
+
+    MediaPipe resizes its input to 256x256 internally anyway, so converting a
+    full 1080p frame to RGB only costs time. Each frame is resized once into a
+    preallocated buffer (aspect ratio preserved) and converted in place. The
+    landmarks MediaPipe returns are normalized to [0, 1] of the image it was
+    given, so they map straight back onto the full-resolution display frame:
+    LandmarkFrame.pixels scales them by the display frame's size.
+
+    With roi_tracking enabled only a square crop around the previous frame's
+    landmarks is resized (to roi_size x roi_size) and sent to MediaPipe; the
+    landmarks are mapped back into full-frame coordinates. Whenever tracking
+    is lost the next frame is detected on the full frame again.
+    """
+
+    def __init__(self, inference_width=640, min_detection_confidence=0.7, min_tracking_confidence=0.7,
+                 roi_tracking=False, roi_size=384):
+        self.inference_width = inference_width
+        self.roi_tracker = RoiTracker() if roi_tracking else None
+        self.roi_size = roi_size
+        self._roi_small = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self._roi_rgb = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self.pose = mp.solutions.pose.Pose(
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        self._frame_shape = None
+        self._small = None
+        self._rgb = None
+
+    def inference_size(self, frame_width, frame_height):
+        if not self.inference_width or frame_width <= self.inference_width:
+            return frame_width, frame_height
+        scale = self.inference_width / frame_width
+        return self.inference_width, max(1, int(round(frame_height * scale)))
+
+    def _allocate(self, frame_shape):
+        height, width = frame_shape[:2]
+        inf_w, inf_h = self.inference_size(width, height)
+        self._small = None
+        if (inf_w, inf_h) != (width, height):
+            self._small = np.empty((inf_h, inf_w, 3), dtype=np.uint8)
+        self._rgb = np.empty((inf_h, inf_w, 3), dtype=np.uint8)
+        self._frame_shape = frame_shape
+
+    def prepare(self, frame):
+        """Returns the RGB inference image for a BGR frame (a reused buffer)."""
+        if frame.shape != self._frame_shape:
+            self._allocate(frame.shape)
+        src = frame
+        if self._small is not None:
+            cv2.resize(frame, (self._small.shape[1], self._small.shape[0]), dst=self._small,
+                       interpolation=cv2.INTER_AREA)
+            src = self._small
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def _detect_roi(self, frame):
+        crop = self.roi_tracker.crop(frame)
+        cv2.resize(crop, (self.roi_size, self.roi_size), dst=self._roi_small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._roi_small, cv2.COLOR_BGR2RGB, dst=self._roi_rgb)
+        results = self.pose.process(self._roi_rgb)
+        if not results.pose_landmarks:
+            return None
+        height, width = frame.shape[:2]
+        return self.roi_tracker.to_frame(landmarks_to_array(results.pose_landmarks), width, height)
+
+    def detect(self, frame, prepared=None):
+        """Runs pose detection on a BGR frame.
+
+        Returns the (33, 4) landmark array normalized to the full frame, or
+        None when no pose was found. prepared may pass in the output of
+        prepare(frame) when the caller already has it, to avoid converting
+        the frame twice.
+        """
+        if self.roi_tracker is not None and self.roi_tracker.roi is not None:
+            landmarks = self._detect_roi(frame)
+        else:
+            results = self.pose.process(prepared if prepared is not None else self.prepare(frame))
+            landmarks = landmarks_to_array(results.pose_landmarks) if results.pose_landmarks else None
+        if self.roi_tracker is not None:
+            height, width = frame.shape[:2]
+            self.roi_tracker.update(landmarks, width, height)
+        return landmarks
+
+    def close(self):
+        self.pose.close()
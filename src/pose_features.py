@@ -0,0 +1,83 @@
+from functools import cached_property
+
+import numpy as np
+
+from geometry import joint_angles, midpoints, segment_lengths, torso_length
+
+
+# named joint angles for feedback and debug output: (a, vertex, b)
+LIMB_ANGLES = {
+    'left_arm': (15, 11, 13),
+    'right_arm': (16, 12, 14),
+    'left_leg': (23, 25, 27),
+    'right_leg': (24, 26, 28),
+}
+
+
+class PoseFeatures:
+    """Derived geometry for one frame's landmarks, each piece computed at most once.
+
+    Created once per frame from a LandmarkFrame and handed to everything that
+    needs geometry (scoring, pose recognition, spoken feedback, debug output
+    and the overlay), so nothing is recomputed per consumer. Joint angles
+    and segment lengths are cached per index array, so the rule programs of
+    several poses share one kernel call when they ask for the same set.
+    `cache` holds other per-frame results, such as scores by level.
+    """
+
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self.width = landmarks.width
+        self.height = landmarks.height
+        self.cache = {}
+        self._angles = {}
+        self._lengths = {}
+
+    @cached_property
+    def points(self):
+        """(33, 2) float64 display-frame pixels."""
+        return self.landmarks.pixels.astype(np.float64)
+
+    @cached_property
+    def draw_points(self):
+        """(33, 2) int32 pixel positions for cv2 drawing calls."""
+        return self.landmarks.pixels.astype(np.int32)
+
+    @cached_property
+    def torso_length(self):
+        """Mid-shoulder to mid-hip distance, or a quarter of the frame when the torso collapses."""
+        length = float(torso_length(self.points))
+        return length if length >= 1 else max(self.height, self.width) / 4.0
+
+    @cached_property
+    def shoulder_mid(self):
+        return midpoints(self.points, [(11, 12)])[0]
+
+    @cached_property
+    def hip_mid(self):
+        return midpoints(self.points, [(23, 24)])[0]
+
+    @cached_property
+    def limb_angles(self):
+        """{name: degrees} for LIMB_ANGLES."""
+        return dict(zip(LIMB_ANGLES, self.angles(np.array(list(LIMB_ANGLES.values()))).tolist()))
+
+    def angles(self, triplets):
+        """joint_angles for a (K, 3) index array, cached per array."""
+        key = triplets.tobytes()
+        if key not in self._angles:
+            self._angles[key] = joint_angles(self.points, triplets)
+        return self._angles[key]
+
+    def lengths(self, pairs):
+        """segment_lengths for a (K, 2) index array, cached per array."""
+        key = pairs.tobytes()
+        if key not in self._lengths:
+            self._lengths[key] = segment_lengths(self.points, pairs)
+        return self._lengths[key]
+
+    def summary(self):
+        """Compact dict for debug logging."""
+        summary = {'torso_px': round(self.torso_length, 1)}
+        summary.update({name: round(angle, 1) for name, angle in self.limb_angles.items()})
+        return summary
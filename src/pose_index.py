@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import numpy as np
+
+from pose_templates import MIRRORED_LANDMARKS, TEMPLATE_LANDMARKS
+
+
+# positions of the left/right landmark pairs inside TEMPLATE_LANDMARKS
+_LEFT = np.flatnonzero(TEMPLATE_LANDMARKS % 2 == 1)
+_RIGHT = np.flatnonzero((TEMPLATE_LANDMARKS % 2 == 0) & (TEMPLATE_LANDMARKS > 0))
+FEATURE_SIZE = 2 * len(TEMPLATE_LANDMARKS)
+
+DEFAULT_INDEX = Path(__file__).resolve().parent.parent / "assets" / "pose_index.npz"
+
+
+def index_vector(points):
+    """(..., 33, 2) pixels -> (..., FEATURE_SIZE) float32 unit vectors.
+
+    Position and size are removed (centred, unit norm), orientation is kept.
+    A pose and its mirror image map to the same vector: of the two, the one
+    whose left side sits lower in the frame (summed y of left minus right
+    landmarks >= 0) is used, so one catalog entry covers both sides.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    shapes = points[..., TEMPLATE_LANDMARKS, :]
+    mirrored = points[..., MIRRORED_LANDMARKS, :] * np.array([-1.0, 1.0])
+    lower_left = (shapes[..., _LEFT, 1] - shapes[..., _RIGHT, 1]).sum(axis=-1) >= 0
+    shapes = np.where(lower_left[..., None, None], shapes, mirrored)
+    shapes = shapes - shapes.mean(axis=-2, keepdims=True)
+    features = shapes.reshape(shapes.shape[:-2] + (FEATURE_SIZE,))
+    norms = np.linalg.norm(features, axis=-1, keepdims=True)
+    features = np.divide(features, norms, out=np.zeros_like(features), where=norms > 0)
+    return features.astype(np.float32)
+
+
+class PoseIndex:
+    """Nearest-neighbour search over a catalog of poses.
+
+    Entries are index_vector vectors in one contiguous (capacity, D) array
+    that doubles when full, so inserts are amortized O(1). A query is one
+    matrix-vector product. Because all vectors have unit norm, the squared
+    distance is 2 - 2 * dot, and argpartition picks the top k without a full
+    sort. A few thousand entries search in well under a millisecond, which
+    is faster than a tree structure at this dimensionality.
+    """
+
+    def __init__(self, capacity=64):
+        self._features = np.empty((max(1, capacity), FEATURE_SIZE), dtype=np.float32)
+        self._levels = np.empty(max(1, capacity), dtype=np.int64)
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def features(self):
+        return self._features[:len(self.names)]
+
+    @property
+    def levels(self):
+        return self._levels[:len(self.names)]
+
+    def _reserve(self, size):
+        capacity = len(self._features)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        features = np.empty((capacity, FEATURE_SIZE), dtype=np.float32)
+        levels = np.empty(capacity, dtype=np.int64)
+        features[:len(self.names)] = self.features
+        levels[:len(self.names)] = self.levels
+        self._features, self._levels = features, levels
+
+    def add(self, names, points, levels=0):
+        """Inserts one pose (name, (33, 2)) or a batch (names, (N, 33, 2)); returns their ids."""
+        if isinstance(names, str):
+            names, points = [names], np.asarray(points)[None]
+        features = index_vector(points)
+        start = len(self.names)
+        self._reserve(start + len(names))
+        self._features[start:start + len(names)] = features
+        self._levels[start:start + len(names)] = levels
+        self.names.extend(str(name) for name in names)
+        return list(range(start, len(self.names)))
+
+    def search(self, points, k=5):
+        """Top-k catalog matches for one (33, 2) pose as [(id, name, level, distance)], nearest first."""
+        size = len(self.names)
+        if size == 0:
+            return []
+        query = index_vector(points)
+        dots = self.features @ query
+        k = min(k, size)
+        top = np.argpartition(-dots, k - 1)[:k] if k < size else np.arange(size)
+        top = top[np.argsort(-dots[top])]
+        distances = np.sqrt(np.maximum(0.0, 2.0 - 2.0 * dots[top]))
+        return [(int(i), self.names[i], int(self._levels[i]), float(d)) for i, d in zip(top, distances)]
+
+    def save(self, path=DEFAULT_INDEX):
+        np.savez(path, names=np.array(self.names), levels=self.levels, features=self.features)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX):
+        with np.load(path) as data:
+            index = cls(capacity=len(data["names"]))
+            count = len(data["names"])
+            index._features[:count] = data["features"]
+            index._levels[:count] = data["levels"]
+            index.names = [str(name) for name in data["names"]]
+        return index
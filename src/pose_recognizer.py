@@ -0,0 +1,73 @@
+import numpy as np
+
+from pose_analyzer import ACCURACY_THRESHOLD, POSE_CONFIG
+from pose_rules import compile_pose_set
+
+
+class PoseRecognizer:
+    """Works out which pose the user is in by scoring every level each frame.
+
+    All levels run through one fused rule program (see pose_rules.py), so the
+    per-frame cost grows with the number of distinct expressions rather than
+    the number of poses. The last `window` frames' scores sit in a ring
+    buffer. The recognized pose is the level with the best mean score, as long
+    as that mean clears `min_accuracy` and the level was the best frame-by-frame
+    in at least `min_votes` of the window.
+    """
+
+    def __init__(self, levels=None, window=15, min_accuracy=ACCURACY_THRESHOLD, min_votes=0.6):
+        self.rules = compile_pose_set(POSE_CONFIG, levels)
+        self.levels = self.rules.levels
+        self.window = window
+        self.min_accuracy = min_accuracy
+        self.min_votes = min_votes
+        self._scores = np.zeros((window, len(self.levels)))
+        self._votes = np.full(window, -1, dtype=np.intp)
+        self._sum = np.zeros(len(self.levels))
+        self._empty = np.zeros(len(self.levels))
+        self._pos = 0
+        self._count = 0
+        self.scores = self._empty  # latest frame's accuracy per level
+        self.level = None
+        self.confidence = 0.0
+
+    def reset(self):
+        self._scores.fill(0.0)
+        self._votes.fill(-1)
+        self._sum.fill(0.0)
+        self._pos = 0
+        self._count = 0
+        self.scores = self._empty
+        self.level = None
+        self.confidence = 0.0
+
+    def update(self, features):
+        """Adds one frame's PoseFeatures (or None) and returns (level or None, confidence 0..1)."""
+        if features is None:
+            scores = self._empty
+            vote = -1
+        else:
+            scores = self.rules.accuracies_for(features)
+            best = int(np.argmax(scores))
+            vote = best if scores[best] >= self.min_accuracy else -1
+        self.scores = scores
+
+        slot = self._pos
+        self._sum -= self._scores[slot]
+        self._scores[slot] = scores
+        self._sum += scores
+        self._votes[slot] = vote
+        self._pos = (slot + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        if self._pos == 0:
+            # re-sum once per lap so the running total cannot drift
+            self._scores.sum(axis=0, out=self._sum)
+
+        mean = self._sum / self._count
+        best = int(np.argmax(mean))
+        self.confidence = int(np.count_nonzero(self._votes == best)) / self.window
+        if mean[best] >= self.min_accuracy and self.confidence >= self.min_votes:
+            self.level = self.levels[best]
+        else:
+            self.level = None
+        return self.level, self.confidence
@@ -0,0 +1,236 @@
+import numpy as np
+
+from geometry import joint_angles, segment_lengths, torso_length
+
+
+# Pose rules are plain data (see POSE_CONFIG in pose_analyzer.py). A pose is a
+# list of weighted terms; each term scores one aspect of the pose from an
+# expression over the landmark pixels:
+#
+#   {'name': ..., 'kind': 'band', 'weight': w, 'value': e, 'target': t, 'tolerance': tol}
+#       w * max(0, 1 - |e - t| / tol)
+#   {'name': ..., 'kind': 'flag', 'weight': w, 'when': p, 'otherwise': o}
+#       w where predicate p holds, else o (a number or another term)
+#
+# Expressions are nested tuples (numbers are constants):
+#   ('x', i) ('y', i) ('mid_y', i, j)      landmark pixel coordinates
+#   ('angle', a, vertex, b) ('dist', i, j)  joint angle in degrees, segment length
+#   ('torso', k)                            k * mid-shoulder to mid-hip distance
+#   ('add'|'sub'|'min'|'max', e, f) ('abs'|'relu', e)
+#   ('lt'|'gt', e, f) ('and'|'or', p, q) ('not', p) ('select', p, e, f)
+#
+# CompiledRules turns the terms into a flat list of array operations with
+# shared subexpressions evaluated once; all angles and distances the poses
+# need come from one joint_angles and one segment_lengths call. Inputs may
+# carry any leading batch dimensions.
+
+_BINARY = {
+    'add': np.add,
+    'sub': np.subtract,
+    'min': np.minimum,
+    'max': np.maximum,
+    'lt': np.less,
+    'gt': np.greater,
+    'and': np.logical_and,
+    'or': np.logical_or,
+}
+_UNARY = {
+    'abs': np.abs,
+    'relu': lambda v: np.maximum(v, 0.0),
+    'not': np.logical_not,
+}
+
+
+def _freeze(expr):
+    """Nested lists (e.g. loaded from JSON) -> hashable nested tuples."""
+    if isinstance(expr, (list, tuple)):
+        return tuple(_freeze(item) for item in expr)
+    return expr
+
+
+def _load(kind, index):
+    # leaf operations read the per-call environment (points, torso, angles, dists)
+    if kind == 'x':
+        return lambda values, env: env[0][..., index, 0]
+    if kind == 'y':
+        return lambda values, env: env[0][..., index, 1]
+    if kind == 'mid_y':
+        a, b = index
+        return lambda values, env: (env[0][..., a, 1] + env[0][..., b, 1]) / 2.0
+    if kind == 'torso':
+        return lambda values, env: env[1] * index
+    if kind == 'angle':
+        return lambda values, env: env[2][..., index]
+    if kind == 'dist':
+        return lambda values, env: env[3][..., index]
+    return lambda values, env: index  # const
+
+
+class CompiledRules:
+    """Vectorized evaluator for the terms of one or more poses.
+
+    All levels share one operation list, so an expression used by several
+    poses (a leg angle, the hip centre, ...) is computed once per call no
+    matter how many poses read it.
+    """
+
+    def __init__(self, poses):
+        self.levels = list(poses)
+        self.term_names = {}
+        self._ops = []      # callables in evaluation order
+        self._slots = {}    # expression -> index into _ops
+        self._triplets = []
+        self._pairs = []
+        self._term_slots = {}
+        for level, terms in poses.items():
+            self._level = level
+            self.term_names[level] = [term['name'] for term in terms]
+            self._term_slots[level] = [self._term(term) for term in terms]
+        self._triplets = np.array(self._triplets, dtype=np.intp).reshape(-1, 3)
+        self._pairs = np.array(self._pairs, dtype=np.intp).reshape(-1, 2)
+
+    def _emit(self, key, op):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._ops)
+            self._ops.append(op)
+            self._slots[key] = slot
+        return slot
+
+    def _expr(self, expr):
+        if isinstance(expr, (int, float)):
+            return self._emit(('const', float(expr)), _load('const', float(expr)))
+        expr = _freeze(expr)
+        if expr in self._slots:
+            return self._slots[expr]
+        op, args = expr[0], expr[1:]
+        if op in ('x', 'y'):
+            return self._emit(expr, _load(op, int(args[0])))
+        if op == 'mid_y':
+            return self._emit(expr, _load(op, (int(args[0]), int(args[1]))))
+        if op == 'torso':
+            return self._emit(expr, _load(op, float(args[0]) if args else 1.0))
+        if op == 'const':
+            return self._emit(expr, _load(op, float(args[0])))
+        if op == 'angle':
+            if args not in self._triplets:
+                self._triplets.append(args)
+            return self._emit(expr, _load(op, self._triplets.index(args)))
+        if op == 'dist':
+            if args not in self._pairs:
+                self._pairs.append(args)
+            return self._emit(expr, _load(op, self._pairs.index(args)))
+        if op in _UNARY:
+            fn, a = _UNARY[op], self._expr(args[0])
+            return self._emit(expr, lambda values, env: fn(values[a]))
+        if op in _BINARY:
+            fn, a, b = _BINARY[op], self._expr(args[0]), self._expr(args[1])
+            return self._emit(expr, lambda values, env: fn(values[a], values[b]))
+        if op == 'select':
+            cond, a, b = (self._expr(arg) for arg in args)
+            return self._emit(expr, lambda values, env: np.where(values[cond], values[a], values[b]))
+        raise ValueError(f"Unknown rule expression '{op}' in pose {self._level}")
+
+    def _term(self, term):
+        kind = term.get('kind')
+        weight = float(term['weight'])
+        if kind == 'band':
+            v, target, tolerance = (self._expr(term['value']), self._expr(term.get('target', 0.0)),
+                                    self._expr(term['tolerance']))
+            return self._emit(('band', v, target, tolerance, weight), lambda values, env: np.maximum(
+                0.0, weight * (1.0 - np.abs(values[v] - values[target]) / values[tolerance])))
+        if kind == 'flag':
+            otherwise = term.get('otherwise', 0.0)
+            if isinstance(otherwise, dict):
+                other = self._term(otherwise)
+            else:
+                other = self._expr(otherwise)
+            when = self._expr(term['when'])
+            return self._emit(('flag', when, weight, other),
+                              lambda values, env: np.where(values[when], weight, values[other]))
+        raise ValueError(f"Unknown term kind '{kind}' in pose {self._level}")
+
+    def _environment(self, points, width, height):
+        points = np.asarray(points, dtype=np.float64)
+        torso = torso_length(points)
+        fallback = np.maximum(height, width) / 4.0
+        torso = np.where(torso < 1, fallback, torso)
+        angles = joint_angles(points, self._triplets) if len(self._triplets) else None
+        dists = segment_lengths(points, self._pairs) if len(self._pairs) else None
+        return points, torso, angles, dists
+
+    def _feature_environment(self, features):
+        # geometry comes from (and is cached on) the frame's PoseFeatures
+        angles = features.angles(self._triplets) if len(self._triplets) else None
+        dists = features.lengths(self._pairs) if len(self._pairs) else None
+        return features.points, np.asarray(features.torso_length), angles, dists
+
+    def _run(self, env):
+        values = []
+        for op in self._ops:
+            values.append(op(values, env))
+        return values, env[1].shape
+
+    def _accuracies(self, env):
+        values, shape = self._run(env)
+        accuracy = np.empty(shape + (len(self.levels),))
+        for column, level in enumerate(self.levels):
+            total = 0.0
+            for slot in self._term_slots[level]:
+                total = total + values[slot]
+            accuracy[..., column] = total
+        return np.clip(accuracy, 0.0, 100.0, out=accuracy)
+
+    def _evaluate(self, env):
+        values, shape = self._run(env)
+        accuracy = np.empty(shape + (len(self.levels),))
+        sub_scores = {}
+        for column, level in enumerate(self.levels):
+            terms = {}
+            total = 0.0
+            for name, slot in zip(self.term_names[level], self._term_slots[level]):
+                score = np.broadcast_to(values[slot], shape).astype(np.float64)
+                terms[name] = score
+                total = total + score
+            accuracy[..., column] = total
+            sub_scores[level] = terms
+        return np.clip(accuracy, 0.0, 100.0, out=accuracy), sub_scores
+
+    def accuracies(self, points, width, height):
+        """points (..., 33, 2) pixels -> accuracy (..., L) with L in `levels` order."""
+        return self._accuracies(self._environment(points, width, height))
+
+    def evaluate(self, points, width, height):
+        """Like accuracies(), plus {level: {term name: score (...,)}}."""
+        return self._evaluate(self._environment(points, width, height))
+
+    def accuracies_for(self, features):
+        """accuracies() for one frame's PoseFeatures."""
+        return self._accuracies(self._feature_environment(features))
+
+    def evaluate_for(self, features):
+        """evaluate() for one frame's PoseFeatures."""
+        return self._evaluate(self._feature_environment(features))
+
+
+class CompiledPose(CompiledRules):
+    """CompiledRules for a single level; evaluate returns (accuracy (...,), {term name: score (...,)})."""
+
+    def __init__(self, level, terms):
+        super().__init__({level: terms})
+        self.level = level
+
+    def _evaluate(self, env):
+        accuracy, sub_scores = super()._evaluate(env)
+        return accuracy[..., 0], sub_scores[self.level]
+
+
+def compile_pose_config(config):
+    """{level: {'terms': [...]}} -> {level: CompiledPose}."""
+    return {level: CompiledPose(level, spec['terms']) for level, spec in config.items()}
+
+
+def compile_pose_set(config, levels=None):
+    """One fused CompiledRules over `levels` (default: every level in config)."""
+    levels = sorted(config) if levels is None else list(levels)
+    return CompiledRules({level: config[level]['terms'] for level in levels})
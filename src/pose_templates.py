@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import numpy as np
+
+from pose_analyzer import ACCURACY_THRESHOLD
+from pose_features import PoseFeatures
+
+
+DEFAULT_TEMPLATES = Path(__file__).resolve().parent.parent / "assets" / "pose_templates.npz"
+
+# landmarks compared against templates (nose, arms, legs) and their mirror images
+TEMPLATE_LANDMARKS = np.array([0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28])
+MIRRORED_LANDMARKS = np.array([0, 12, 11, 14, 13, 16, 15, 24, 23, 26, 25, 28, 27])
+
+
+def normalize_shapes(points, indices=TEMPLATE_LANDMARKS):
+    """(..., 33, 2) pixels -> (..., K) complex shapes, centred and scaled to unit norm.
+
+    Writing each point as x + iy turns a 2D similarity transform into a
+    multiplication by one complex number, which is what keeps matching down
+    to a single matrix product.
+    """
+    points = np.asarray(points, dtype=np.float64)[..., indices, :]
+    shapes = points[..., 0] + 1j * points[..., 1]
+    shapes = shapes - shapes.mean(axis=-1, keepdims=True)
+    norms = np.linalg.norm(shapes, axis=-1, keepdims=True)
+    return np.divide(shapes, norms, out=np.zeros_like(shapes), where=norms > 0)
+
+
+class PoseTemplates:
+    """Scores live skeletons against stored reference skeletons.
+
+    Each template is normalized and mirrored once when loaded. For unit
+    shapes q and t, the best similarity alignment (translation, rotation and
+    uniform scale) of t onto q leaves a residual of 1 - |<t, q>|^2. So one
+    complex matrix product against the stacked templates gives the
+    Procrustes distance to every template and its mirror image. Rotation is
+    capped at `max_rotation` degrees, so a standing template cannot be fitted
+    to someone lying down.
+    """
+
+    def __init__(self, names, levels, points, max_distance=0.5, max_rotation=30.0):
+        self.names = [str(name) for name in names]
+        self.levels = np.asarray(levels, dtype=np.int64)
+        self.points = np.asarray(points, dtype=np.float32).reshape(-1, 33, 2)
+        self.max_distance = max_distance
+        self.max_rotation = np.radians(max_rotation)
+        shapes = normalize_shapes(self.points)
+        # mirrored copy: swap left/right landmarks and negate x (x + iy -> -x + iy)
+        mirrored = -np.conj(normalize_shapes(self.points, MIRRORED_LANDMARKS))
+        self._matrix = np.conj(np.concatenate([shapes, mirrored])).T  # (K, 2T)
+        self._levels = np.concatenate([self.levels, self.levels])
+
+    @classmethod
+    def load(cls, path=DEFAULT_TEMPLATES, **options):
+        with np.load(path) as data:
+            return cls(data["names"], data["levels"], data["points"], **options)
+
+    def save(self, path=DEFAULT_TEMPLATES):
+        np.savez(path, names=np.array(self.names), levels=self.levels, points=self.points)
+
+    def add(self, name, level, points):
+        """Returns a new PoseTemplates with one more (33, 2) pixel template."""
+        return PoseTemplates(self.names + [name], np.append(self.levels, level),
+                             np.concatenate([self.points, np.asarray(points, np.float32)[None]]),
+                             self.max_distance, np.degrees(self.max_rotation))
+
+    def __len__(self):
+        return len(self.names)
+
+    def distances(self, points):
+        """(..., 33, 2) pixels -> (..., 2T) Procrustes distances; mirrors are the last T columns."""
+        similarity = normalize_shapes(points) @ self._matrix
+        magnitude = np.abs(similarity)
+        rotation = np.angle(similarity)
+        excess = np.abs(rotation) - np.minimum(np.abs(rotation), self.max_rotation)
+        fit = magnitude * np.maximum(np.cos(excess), 0.0)
+        return np.sqrt(np.maximum(0.0, 1.0 - fit * fit))
+
+    def check_pose_accuracy(self, pose_level, landmarks, debug=False):
+        """Template counterpart of pose_analyzer.check_pose_accuracy."""
+        if landmarks is None:
+            return False, 0.0, {}
+        candidates = np.flatnonzero(self._levels == pose_level)
+        if len(candidates) == 0:
+            return False, 0.0, {}
+        features = landmarks if isinstance(landmarks, PoseFeatures) else PoseFeatures(landmarks)
+        key = ('template_distances', id(self))
+        if key not in features.cache:
+            features.cache[key] = self.distances(features.points)
+        distances = features.cache[key][candidates]
+        best = int(np.argmin(distances))
+        distance = float(distances[best])
+        accuracy = 100.0 * max(0.0, 1.0 - distance / self.max_distance)
+        is_correct = accuracy >= ACCURACY_THRESHOLD
+        sub_scores = {'procrustes_distance': distance,
+                      'mirrored': float(candidates[best] >= len(self.names))}
+        if debug:
+            template = self.names[candidates[best] % len(self.names)]
+            print(f"[TEMPLATE] Level {pose_level}: {accuracy:.1f}% against '{template}' (distance {distance:.3f})")
+        return is_correct, accuracy, sub_scores
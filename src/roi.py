@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class RoiTracker:
+    """Square region of interest around the person, derived from the previous frame's landmarks.
+
+    The box is the bounding box of the visible landmarks, padded and made
+    square, and is only moved when the person drifts out of its inner margin
+    or noticeably changes size. That keeps MediaPipe's own frame-to-frame
+    tracking stable. roi is None while tracking is lost, which means the
+    whole frame goes to detection.
+    """
+
+    def __init__(self, padding=0.3, min_visible=8, visibility_threshold=0.5, margin=0.1, resize_tolerance=0.2):
+        self.padding = padding
+        self.min_visible = min_visible
+        self.visibility_threshold = visibility_threshold
+        self.margin = margin
+        self.resize_tolerance = resize_tolerance
+        self.roi = None  # (x0, y0, side) in frame pixels
+        self.lost = 0
+
+    def reset(self):
+        self.roi = None
+
+    def update(self, landmarks, frame_width, frame_height):
+        """Feeds the full-frame normalized (33, 4) landmarks of the frame just processed."""
+        if landmarks is None:
+            if self.roi is not None:
+                self.lost += 1
+            self.roi = None
+            return
+        visible = landmarks[:, 3] >= self.visibility_threshold
+        if np.count_nonzero(visible) < self.min_visible:
+            if self.roi is not None:
+                self.lost += 1
+            self.roi = None
+            return
+
+        xs = np.clip(landmarks[visible, 0], 0.0, 1.0) * frame_width
+        ys = np.clip(landmarks[visible, 1], 0.0, 1.0) * frame_height
+        x_min, x_max = float(xs.min()), float(xs.max())
+        y_min, y_max = float(ys.min()), float(ys.max())
+        side = max(x_max - x_min, y_max - y_min) * (1.0 + 2.0 * self.padding)
+        side = int(min(max(side, 64), frame_width, frame_height))
+
+        if self.roi is not None:
+            x0, y0, old_side = self.roi
+            inset = old_side * self.margin
+            inside = (x_min >= x0 + inset and x_max <= x0 + old_side - inset
+                      and y_min >= y0 + inset and y_max <= y0 + old_side - inset)
+            if inside and abs(side - old_side) <= self.resize_tolerance * old_side:
+                return
+
+        cx, cy = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+        x0 = int(min(max(cx - side / 2.0, 0), frame_width - side))
+        y0 = int(min(max(cy - side / 2.0, 0), frame_height - side))
+        self.roi = (x0, y0, side)
+
+    def crop(self, frame):
+        """View of the frame inside the ROI, or None when tracking is lost."""
+        if self.roi is None:
+            return None
+        x0, y0, side = self.roi
+        return frame[y0:y0 + side, x0:x0 + side]
+
+    def to_frame(self, landmarks, frame_width, frame_height):
+        """Maps landmarks normalized to the ROI crop back to full-frame normalized coordinates."""
+        x0, y0, side = self.roi
+        mapped = landmarks.copy()
+        mapped[:, 0] = (landmarks[:, 0] * side + x0) / frame_width
+        mapped[:, 1] = (landmarks[:, 1] * side + y0) / frame_height
+        # MediaPipe scales z like x
+        mapped[:, 2] = landmarks[:, 2] * side / frame_width
+        return mapped
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+from frame_buffers import blit_masked
+
+
+# MediaPipe Pose skeleton (same pairs as mp.solutions.pose.POSE_CONNECTIONS)
+POSE_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+])
+FACE_LANDMARKS = np.arange(0, 11)
+HAND_LANDMARKS = np.arange(17, 23)
+
+# level of detail -> landmarks left out (bones touching them are dropped too)
+DETAIL_LEVELS = {
+    "full": np.array([], dtype=np.intp),                           # every bone and joint
+    "body": np.concatenate([FACE_LANDMARKS[1:], HAND_LANDMARKS]),  # nose kept as the head
+    "bones": None,                                                 # body bones, no joint markers
+}
+
+
+def _joint_sprite(radius, fill, ring, ring_thickness):
+    """Pre-rendered filled circle with a ring -> (BGR patch, uint8 mask)."""
+    size = 2 * radius + ring_thickness + 1
+    center = (size // 2, size // 2)
+    patch = np.zeros((size, size, 3), dtype=np.uint8)
+    mask = np.zeros((size, size), dtype=np.uint8)
+    for target, colors in ((patch, (fill, ring)), (mask, (255, 255))):
+        cv2.circle(target, center, radius, colors[0], -1)
+        cv2.circle(target, center, radius, colors[1], ring_thickness)
+    return patch, mask
+
+
+class SkeletonRenderer:
+    """Draws the live skeleton overlay from the (33, 2) landmark pixel array.
+
+    The bones to draw are precomputed as index arrays per level of detail, so
+    a frame is one fancy-indexing gather plus a single cv2.polylines call.
+    Joint markers (a coloured disc with a white ring) are rendered once as
+    sprites and copied through their mask. Landmarks with visibility below
+    `visibility_threshold`, and the bones attached to them, are culled.
+    """
+
+    def __init__(self, detail="full", visibility_threshold=0.5, bone_color=(50, 200, 100), bone_thickness=8):
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown skeleton detail '{detail}'")
+        self.detail = detail
+        self.visibility_threshold = visibility_threshold
+        self.bone_color = bone_color
+        self.bone_thickness = bone_thickness
+
+        hidden = DETAIL_LEVELS[detail]
+        if hidden is None:
+            hidden = np.concatenate([FACE_LANDMARKS, HAND_LANDMARKS])
+            self.joints = np.array([], dtype=np.intp)
+        else:
+            self.joints = np.setdiff1d(np.arange(33), hidden)
+        keep = ~np.isin(POSE_CONNECTIONS, hidden).any(axis=1)
+        self.connections = POSE_CONNECTIONS[keep]
+        # head landmarks get the larger pink marker, the rest the green one
+        self.sprites = {
+            True: _joint_sprite(18, (255, 100, 200), (255, 255, 255), 4),
+            False: _joint_sprite(15, (100, 255, 200), (255, 255, 255), 3),
+        }
+        self._is_face = np.isin(np.arange(33), FACE_LANDMARKS)
+
+    def draw(self, frame, points, visibility=None):
+        """points: (33, 2) int32 pixels; visibility: (33,) or None to draw everything."""
+        visible = np.ones(len(points), dtype=bool)
+        if visibility is not None and self.visibility_threshold > 0:
+            visible = visibility >= self.visibility_threshold
+
+        connections = self.connections[visible[self.connections].all(axis=1)]
+        if len(connections):
+            cv2.polylines(frame, points[connections], False, self.bone_color, self.bone_thickness)
+
+        for joint in self.joints[visible[self.joints]]:
+            patch, mask = self.sprites[bool(self._is_face[joint])]
+            half = patch.shape[0] // 2
+            blit_masked(frame, int(points[joint, 0]) - half, int(points[joint, 1]) - half, patch, mask)
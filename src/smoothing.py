@@ -0,0 +1,62 @@
+import math
+import time
+
+
+class AccuracySmoother:
+    """Per-level exponential moving average of accuracy, weighted by elapsed time.
+
+    Each update is O(1). The new sample's weight is 1 - exp(-dt / time_constant),
+    so a 12 FPS and a 30 FPS stream settle at the same rate. Timestamps default
+    to the monotonic clock; pass the frames' own timestamps to replay
+    recordings faster than real time.
+    """
+
+    def __init__(self, time_constant=0.1, clock=time.monotonic):
+        self.time_constant = time_constant
+        self.clock = clock
+        self._state = {}  # level -> (smoothed value, timestamp)
+
+    def update(self, level, value, timestamp=None):
+        now = self.clock() if timestamp is None else timestamp
+        previous = self._state.get(level)
+        if previous is None or self.time_constant <= 0:
+            smoothed = value
+        else:
+            weight = 1.0 - math.exp(-max(0.0, now - previous[1]) / self.time_constant)
+            smoothed = previous[0] + weight * (value - previous[0])
+        self._state[level] = (smoothed, now)
+        return smoothed
+
+    def value(self, level, default=0.0):
+        state = self._state.get(level)
+        return default if state is None else state[0]
+
+    def reset(self, level=None):
+        if level is None:
+            self._state.clear()
+        else:
+            self._state.pop(level, None)
+
+
+class HoldTimer:
+    """How long the current pose has been held, on the same clock as the frames."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = None
+
+    @property
+    def running(self):
+        return self.started is not None
+
+    def start(self, timestamp=None):
+        self.started = self.clock() if timestamp is None else timestamp
+
+    def stop(self):
+        self.started = None
+
+    def elapsed(self, timestamp=None):
+        if self.started is None:
+            return 0.0
+        now = self.clock() if timestamp is None else timestamp
+        return max(0.0, now - self.started)
@@ -0,0 +1,162 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+from frame_buffers import blit_premultiplied
+
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+SHADOW_OFFSET = 2
+GLYPHS = "0123456789.-+"
+NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+
+@lru_cache(maxsize=256)
+def rasterize(text, scale, thickness):
+    """(dx, dy, plane) for one putText stroke pass, cropped to its ink.
+
+    The plane is uint8 transmittance, 255 where the background shows through
+    and 0 where it is fully inked, which is the form the blend consumes. It
+    does not depend on the text colour. (dx, dy) is the top-left corner
+    relative to the putText origin.
+    """
+    (width, height), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+    pad = 2 * thickness + 8
+    origin = (pad, pad + height)
+    plane = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+    cv2.putText(plane, text, origin, FONT, scale, 255, thickness)
+    x, y, w, h = cv2.boundingRect(plane)
+    return x - origin[0], y - origin[1], 255 - plane[y:y + h, x:x + w]
+
+
+@lru_cache(maxsize=1024)
+def text_width(text, scale, thickness):
+    return cv2.getTextSize(text, FONT, scale, thickness)[0][0]
+
+
+def text_offset(text, i, scale, thickness):
+    """x offset putText gives text[i]: the width up to and including it, minus its own width.
+
+    Glyph advances depend on the stroke thickness, so the shadow pass
+    (thickness + 2) and the text pass need their own offsets.
+    """
+    if i == 0:
+        return 0
+    return text_width(text[:i + 1], scale, thickness) - text_width(text[i], scale, thickness)
+
+
+def compose(layers):
+    """Planes for several layers of (x, y, plane) pieces, on one shared bounding box.
+
+    Returns (x0, y0, [plane per layer]). Overlapping transmittance within a
+    layer multiplies, which is what drawing every piece on top of the others
+    gives.
+    """
+    layers = [[piece for piece in layer if piece[2].size] for layer in layers]
+    pieces = [piece for layer in layers for piece in layer]
+    if not pieces:
+        return 0, 0, [np.zeros((0, 0), dtype=np.uint8) for _ in layers]
+    x0 = min(x for x, _, _ in pieces)
+    y0 = min(y for _, y, _ in pieces)
+    x1 = max(x + plane.shape[1] for x, _, plane in pieces)
+    y1 = max(y + plane.shape[0] for _, y, plane in pieces)
+    planes = []
+    for layer in layers:
+        out = np.full((y1 - y0, x1 - x0), 255, dtype=np.uint8)
+        for x, y, plane in layer:
+            region = (slice(y - y0, y - y0 + plane.shape[0]), slice(x - x0, x - x0 + plane.shape[1]))
+            cv2.multiply(out[region], plane, dst=out[region], scale=1 / 255)
+        planes.append(out)
+    return x0, y0, planes
+
+
+class TextSprite:
+    """A shadowed string ready to blend: premultiplied colour plus inverse alpha.
+
+    Equivalent to a BGRA patch, stored the way the blend consumes it, so
+    drawing is a single multiply-add over the patch area and keeps putText's
+    anti-aliased edges.
+    """
+
+    __slots__ = ("dx", "dy", "color", "inverse_alpha")
+
+    def __init__(self, planes, color):
+        self.dx, self.dy, shadow, foreground = planes
+        if not shadow.size:
+            self.color = self.inverse_alpha = np.zeros((0, 0, 3), dtype=np.uint8)
+            return
+        self.color = cv2.multiply(cv2.cvtColor(255 - foreground, cv2.COLOR_GRAY2BGR), tuple(color) + (0,), scale=1 / 255)
+        self.inverse_alpha = cv2.cvtColor(cv2.multiply(shadow, foreground, scale=1 / 255), cv2.COLOR_GRAY2BGR)
+
+    def blit(self, frame, x, y):
+        if self.color.size:
+            blit_premultiplied(frame, x + self.dx, y + self.dy, self.inverse_alpha, self.color)
+
+
+class TextRenderer:
+    """Shadowed HUD text from cached sprites instead of two cv2.putText calls per string.
+
+    Each (text, color, scale, thickness) is rendered into a sprite once and
+    then blended into the frame; `max_entries` bounds the cache, least
+    recently used first. Strings with numbers in them (FPS, accuracy, hold
+    time) are not rasterized again for every new value: the text around the
+    number is cached and the digits come from a glyph atlas per size and
+    stroke, placed where putText would put them.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.renders = 0
+        self._sprites = OrderedDict()
+        self._atlases = {}
+
+    def atlas(self, scale, thickness):
+        """{character: rasterized plane} for the digits and number punctuation at one stroke."""
+        key = (scale, thickness)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = {glyph: rasterize(glyph, scale, thickness) for glyph in GLYPHS}
+            self._atlases[key] = atlas
+        return atlas
+
+    def layout(self, text, scale, thickness, shift=0):
+        """(x, y, plane) pieces for one stroke pass of text; numbers come glyph by glyph from the atlas."""
+        atlas = self.atlas(scale, thickness)
+        spans = []  # (start index, rasterized piece)
+        start = 0
+        for match in NUMBER.finditer(text):
+            if match.start() > start:
+                spans.append((start, rasterize(text[start:match.start()], scale, thickness)))
+            spans.extend((i, atlas[text[i]]) for i in range(match.start(), match.end()))
+            start = match.end()
+        if start < len(text):
+            spans.append((start, rasterize(text[start:], scale, thickness)))
+        return [(text_offset(text, i, scale, thickness) + dx + shift, dy + shift, plane)
+                for i, (dx, dy, plane) in spans]
+
+    def planes(self, text, scale, thickness):
+        """(dx, dy, shadow, foreground) transmittance for the shadowed string."""
+        x0, y0, (shadow, foreground) = compose([
+            self.layout(text, scale, thickness + 2, SHADOW_OFFSET),
+            self.layout(text, scale, thickness),
+        ])
+        return x0, y0, shadow, foreground
+
+    def sprite(self, text, color, scale, thickness):
+        key = (text, color, scale, thickness)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+        sprite = TextSprite(self.planes(text, scale, thickness), color)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        self.renders += 1
+        return sprite
+
+    def draw(self, frame, text, position, color=(255, 255, 255), scale=1.0, thickness=2):
+        self.sprite(text, color, scale, thickness).blit(frame, *position)